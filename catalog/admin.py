@@ -1,14 +1,22 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import Group
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.utils.translation import gettext_lazy as _
 
 from catalog.models import (
-    Product, Clothing, Footwear, Accessory, ProductImage, Country, Customer
+    Product, Clothing, Footwear, Accessory, ProductImage, Country, Customer,
+    WishlistItem,
     )
 
 from catalog.forms import ProductImageInlineForm
+from catalog.pagination import CachedCountPaginator, WishlistCountPaginator
+from catalog.search.index import product_index
+from catalog.search.numbers import is_product_number, product_number_q
+from catalog.search.suggest import suggestion_index
+
+# Largest value of the BigAutoField primary key
+MAX_PRODUCT_ID = 9223372036854775807
     
 
 class ProductImageInline(admin.TabularInline):
@@ -28,20 +36,21 @@ class ProductAdmin(admin.ModelAdmin):
         "price_low", 
         "price_high", 
         "description", 
-        "available"
+        "available",
+        "is_published",
         ]
     search_fields = [
         "name", 
         "country__ua_name", 
         "country__en_name", 
         "description", 
-        "product_number", 
         "category",
-        "id"
         ]
-    list_filter = ["available", "country__ua_name", "category"]
+    list_filter = ["available", "is_published", "country__ua_name", "category"]
     inlines = [ProductImageInline]
     show_category = True
+    paginator = CachedCountPaginator
+    show_full_result_count = False
 
     def display_category(self, obj):
         return f"{obj.category} - {obj.get_category_display()}"
@@ -66,13 +75,28 @@ class ProductAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
         return queryset.select_related("country")
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if is_product_number(search_term):
+            condition = product_number_q(search_term)
+            if int(search_term) <= MAX_PRODUCT_ID:
+                condition |= Q(id=int(search_term))
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
     
     def save_model(self, request, obj, form, change):
         if not obj.category:
             obj.category = form.cleaned_data.get("category")
         super().save_model(request, obj, form, change)
 
-    actions = ["change_availability", "make_available", "make_unavailable"]
+    actions = [
+        "change_availability", 
+        "make_available", 
+        "make_unavailable", 
+        "publish", 
+        "unpublish",
+        ]
 
     def has_add_permission(self, request):
         return False
@@ -85,11 +109,25 @@ class ProductAdmin(admin.ModelAdmin):
 
     @admin.action(description=_("Є в наявності"))
     def make_available(self, request, queryset):
-        queryset.update(available=True)
+        self.update_products(queryset, available=True)
 
     @admin.action(description=_("Немає в наявності"))
     def make_unavailable(self, request, queryset):
-        queryset.update(available=False)
+        self.update_products(queryset, available=False)
+
+    @admin.action(description=_("Опублікувати"))
+    def publish(self, request, queryset):
+        self.update_products(queryset, is_published=True)
+
+    @admin.action(description=_("Приховати з каталогу"))
+    def unpublish(self, request, queryset):
+        self.update_products(queryset, is_published=False)
+
+    def update_products(self, queryset, **fields):
+        pks = list(queryset.values_list("pk", flat=True))
+        queryset.update(**fields)
+        product_index.update_products(pks)
+        suggestion_index.invalidate()
 
 
 @admin.register(Clothing)
@@ -97,9 +135,6 @@ class ClothingAdmin(ProductAdmin):
     category = "1"
     show_category = False
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).filter(category=self.category)
-
     def save_model(self, request, obj, form, change):
         obj.category = self.category
         super().save_model(request, obj, form, change)
@@ -113,9 +148,6 @@ class FootwearAdmin(ProductAdmin):
     category = "2"
     show_category = False
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).filter(category=self.category)
-
     def save_model(self, request, obj, form, change):
         obj.category = self.category
         super().save_model(request, obj, form, change)
@@ -129,9 +161,6 @@ class AccessoryAdmin(ProductAdmin):
     category = "3"
     show_category = False
 
-    def get_queryset(self, request):
-        return super().get_queryset(request).filter(category=self.category)
-
     def save_model(self, request, obj, form, change):
         obj.category = self.category
         super().save_model(request, obj, form, change)
@@ -164,7 +193,7 @@ class WishitemsFilter(admin.SimpleListFilter):
         return queryset
     
 
-class WishlistThroughProxy(Customer.wishlist.through):
+class WishlistThroughProxy(WishlistItem):
     class Meta:
         proxy = True
         verbose_name = _("товар")
@@ -277,11 +306,10 @@ class WishlistStatsFilter(admin.SimpleListFilter):
         )
 
     def queryset(self, request, queryset):
-        queryset = queryset.annotate(wishlists_count=Count("customers"))
         if self.value() == "yes":
-            return queryset.filter(wishlists_count__gt=0)
+            return queryset.filter(wishlist_count__gt=0)
         if self.value() == "no":
-            return queryset.filter(wishlists_count=0)
+            return queryset.filter(wishlist_count=0)
         return queryset
     
 
@@ -298,7 +326,7 @@ class WishlistStatsAdmin(ProductAdmin):
         "product_number", 
         "id",
         "name", 
-        "display_wishlists_count",
+        "wishlist_count",
         "display_category", 
         "country", 
         "price_low", 
@@ -306,15 +334,8 @@ class WishlistStatsAdmin(ProductAdmin):
         "available"
         ]
     list_filter = ["available", "country", "category", WishlistStatsFilter]
+    paginator = WishlistCountPaginator
 
-    def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return queryset.annotate(_wishlists_count=Count("customers"))
-    
-    @admin.display(ordering="_wishlists_count", description="Вподобань")
-    def display_wishlists_count(self, obj):
-        return obj._wishlists_count
-    
     def changelist_view(self, request, extra_context=None):
         if not request.GET.get("o"):
             q = request.GET.copy()
@@ -0,0 +1,22 @@
+from functools import cache
+
+from pyuca import Collator
+
+
+@cache
+def get_collator():
+    """The DUCET collator, loaded on first use.
+
+    Parsing allkeys.txt takes a noticeable part of the worker startup and
+    the table stays in memory, so only processes that collate pay for it.
+    """
+    return Collator()
+
+
+def sort_key(text):
+    """Ukrainian sort key of text as a string the database can ORDER BY.
+
+    Every collation weight is written as four hex digits, so comparing the
+    strings gives the same order as comparing the pyuca keys.
+    """
+    return "".join(f"{weight:04x}" for weight in get_collator().sort_key(text))
@@ -1,33 +1,37 @@
-from pyuca import Collator
-
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Count
+from django.db.models import Count, Q
+from django.utils.functional import SimpleLazyObject
 
+from .generation import make_cache_key
 from .models import Country
-
-collator = Collator()
+from .wishlist import get_request_wishlist
 
 
-def countries_context(request):
+def get_countries_with_products():
     fields_to_display = ("id", "ua_name", "en_name", "product_count")
 
-    cached_data = cache.get("countries_with_products")
+    cache_key = make_cache_key("countries_with_products")
+    cached_data = cache.get(cache_key)
     if cached_data is None:
-        countries_with_products = Country.objects.annotate(
-            product_count=Count("products")
-            ).filter(product_count__gt=0).values(*fields_to_display)
+        cached_data = list(Country.objects.annotate(
+            product_count=Count(
+                "products", filter=Q(products__is_published=True)
+                )
+            ).filter(product_count__gt=0).order_by("ua_sort_key")\
+            .values(*fields_to_display))
 
-        cached_data = sorted(
-            countries_with_products, key=lambda c: collator.sort_key(c["ua_name"])
-            )
-        
-        cache.set("countries_with_products", cached_data, 3600)
-    return {"countries_with_products": cached_data}
+        cache.set(cache_key, cached_data, settings.CATALOG_CACHE_TIMEOUT)
+    return cached_data
+
+
+def countries_context(request):
+    return {
+        "countries_with_products": SimpleLazyObject(get_countries_with_products)
+    }
 
 
 def customer_wishlist_context(request):
-    user = request.user
-    product_nums = []
-    if user.is_authenticated:
-        product_nums = user.wishlist.values_list("product_number", flat=True)
-    return {"customer_wishlist_product_numbers": product_nums}
+    return {
+        "customer_wishlist": SimpleLazyObject(lambda: get_request_wishlist(request))
+    }
@@ -0,0 +1,137 @@
+from functools import reduce
+from operator import and_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from catalog.generation import make_cache_key
+from catalog.models import Country, Product
+from catalog.search.normalize import normalize
+
+PRICE_BUCKETS = (
+    ("0-500", "до 500 грн", 0, 500),
+    ("500-1000", "500–1000 грн", 500, 1000),
+    ("1000-2000", "1000–2000 грн", 1000, 2000),
+    ("2000-5000", "2000–5000 грн", 2000, 5000),
+    ("5000-", "від 5000 грн", 5000, None),
+)
+
+
+def get_countries():
+    key = make_cache_key("countries")
+    countries = cache.get(key)
+    if countries is None:
+        countries = list(Country.objects.values("id", "ua_name", "en_name"))
+        cache.set(key, countries, settings.CATALOG_CACHE_TIMEOUT)
+    return countries
+
+
+def price_q(low, high):
+    q = Q(price_low__gte=low)
+    if high is not None:
+        q &= Q(price_low__lt=high)
+    return q
+
+
+class Facet:
+    def __init__(self, name, label, options):
+        self.name = name
+        self.label = label
+        self.options = {value: (option_label, q) for value, option_label, q in options}
+
+
+class FacetSet:
+    """Facet filters of a product list and their counts.
+
+    Each facet keeps a single selected value in the query string. Counts of
+    a facet ignore its own selection, so the other values stay reachable,
+    and all of them are computed in one aggregate query.
+    """
+
+    def __init__(self, params, scope=None):
+        self.scope = scope = scope or {}
+        self.params = params
+        self.facets = []
+
+        if "category" not in scope:
+            self.facets.append(Facet("category", "Категорія", (
+                (value, label, Q(category=value))
+                for value, label in Product.CATEGORY_CHOICES
+            )))
+        if "country_id" not in scope:
+            self.facets.append(Facet("country", "Країна", (
+                (str(country["id"]), country["ua_name"], Q(country_id=country["id"]))
+                for country in get_countries()
+            )))
+        self.facets.append(Facet("available", "Наявність", (
+            ("1", "В наявності", Q(available=True)),
+        )))
+        self.facets.append(Facet("price", "Ціна", (
+            (value, label, price_q(low, high))
+            for value, label, low, high in PRICE_BUCKETS
+        )))
+
+        self.selected = {
+            facet.name: params[facet.name] for facet in self.facets
+            if params.get(facet.name) in facet.options
+        }
+
+    def get_q(self, exclude=None):
+        return reduce(and_, (
+            facet.options[self.selected[facet.name]][1] for facet in self.facets
+            if facet.name in self.selected and facet.name != exclude
+        ), Q())
+
+    def filter(self, results):
+        if not self.selected:
+            return results
+        return results.filter(self.get_q())
+
+    def get_counts(self, results, search=""):
+        key = make_cache_key(
+            "facets",
+            normalize(search).strip(),
+            tuple(sorted(self.scope.items())),
+            tuple(sorted(self.selected.items())),
+        )
+        counts = cache.get(key)
+        if counts is None:
+            aggregates = {}
+            for index, facet in enumerate(self.facets):
+                others = self.get_q(exclude=facet.name)
+                for position, (_, q) in enumerate(facet.options.values()):
+                    aggregates[f"facet_{index}_{position}"] = Count(
+                        "pk", filter=others & q
+                    )
+            counts = results.aggregate(**aggregates) if aggregates else {}
+            cache.set(key, counts, settings.CATALOG_CACHE_TIMEOUT)
+        return counts
+
+    def get_context(self, results, search=""):
+        counts = self.get_counts(results, search)
+        facets = []
+        for index, facet in enumerate(self.facets):
+            options = []
+            for position, (value, (label, _)) in enumerate(facet.options.items()):
+                count = counts[f"facet_{index}_{position}"]
+                selected = self.selected.get(facet.name) == value
+                if not count and not selected:
+                    continue
+
+                params = self.params.copy()
+                params.pop("page", None)
+                if selected:
+                    params.pop(facet.name, None)
+                else:
+                    params[facet.name] = value
+                options.append({
+                    "label": label,
+                    "count": count,
+                    "selected": selected,
+                    "query": params.urlencode(),
+                })
+            if options:
+                facets.append({"name": facet.name, "label": facet.label,
+                               "options": options})
+        return facets
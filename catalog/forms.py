@@ -11,7 +11,9 @@ class ProductSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={
             "placeholder": "Пошук товарів", 
-            "style": "width: 500px;"
+            "style": "width: 500px;",
+            "list": "search-suggestions",
+            "autocomplete": "off",
             })
     )
 
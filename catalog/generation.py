@@ -0,0 +1,45 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+
+CATALOG = "catalog"
+WISHLIST = "wishlist"
+
+
+def generation_cache_key(scope):
+    return f"generation:{scope}"
+
+
+def get_generation(scope=CATALOG):
+    return cache.get_or_set(generation_cache_key(scope), time.time_ns, None)
+
+
+def increment_generation(scope):
+    key = generation_cache_key(scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = time.time_ns()
+        cache.set(key, generation, None)
+        return generation
+
+
+def bump_generation(scope=CATALOG):
+    """Make every cache key of the scope stale.
+
+    Inside a transaction the generation is bumped again on commit, so pages
+    that concurrent requests cached from the old data in the meantime go
+    stale as well.
+    """
+    generation = increment_generation(scope)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: increment_generation(scope))
+    return generation
+
+
+def make_cache_key(prefix, *parts, scope=CATALOG):
+    """Cache key that goes stale as soon as the scope generation is bumped."""
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f"{prefix}:{get_generation(scope)}:{digest}"
@@ -0,0 +1,160 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Accessory, Clothing, Customer, Footwear, Product
+from catalog.search.suggest import COUNTRY, NUMBER, PRODUCT, suggestion_index
+from catalog.views import (
+    AccessoryListView,
+    ClothingListView,
+    FootwearListView,
+    ProductListView,
+    search_suggest_view,
+)
+
+WORDS = (
+    "бушлат", "кітель", "штани", "черевики", "берці", "рюкзак", "підсумок",
+    "куртка", "зимовий", "польовий", "камуфляж", "шолом", "ремінь", "сумка",
+)
+
+
+class Command(BaseCommand):
+    help = "Мікробенчмарки каталогу"
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", choices=["suggest", "list", "render"])
+        parser.add_argument("--repeat", type=int, default=2000)
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Кількість згенерованих товарів замість даних з бази",
+        )
+
+    def handle(self, *args, **options):
+        getattr(self, f"benchmark_{options['target']}")(**options)
+
+    def benchmark_suggest(self, repeat, synthetic, **options):
+        if synthetic:
+            suggestion_index.build(self.synthetic_rows(synthetic))
+        else:
+            suggestion_index.rebuild()
+
+        keys = suggestion_index.keys or [""]
+        prefixes = [
+            random.choice(keys)[:random.randint(1, 5)] for _ in range(repeat)
+        ]
+        factory = RequestFactory()
+        url = reverse("catalog:search-suggest")
+
+        timings = []
+        for prefix in prefixes:
+            request = factory.get(url, {"q": prefix})
+            started = time.perf_counter()
+            search_suggest_view(request)
+            timings.append(time.perf_counter() - started)
+        self.report(f"suggest ({len(suggestion_index.keys)} ключів)", timings)
+
+    def benchmark_list(self, repeat, synthetic, **options):
+        """Category list requests and product creation inside a rolled back
+        transaction, so synthetic products never reach the database."""
+        factory = RequestFactory()
+        views = (
+            ("clothing-list", ClothingListView),
+            ("footwear-list", FootwearListView),
+            ("accessory-list", AccessoryListView),
+        )
+        with transaction.atomic():
+            if synthetic:
+                self.seed_products(synthetic)
+
+            for name, view_class in views:
+                view = view_class.as_view()
+                url = reverse(f"catalog:{name}")
+                timings = []
+                for _ in range(repeat):
+                    request = factory.get(url)
+                    request.user = AnonymousUser()
+                    request.session = {}
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        view(request).render()
+                        timings.append(time.perf_counter() - started)
+                self.report(f"{name} ({len(queries)} запитів)", timings)
+
+            timings = []
+            for model in (Clothing, Footwear, Accessory) * max(1, repeat // 30):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    model.objects.create(name="Бенчмарк", price_low=1, price_high=2)
+                    timings.append(time.perf_counter() - started)
+            self.report(f"create ({len(queries)} запитів)", timings)
+            transaction.set_rollback(True)
+
+    def benchmark_render(self, repeat, synthetic, **options):
+        """Rendering of a full product_list page for a logged in customer,
+        who gets no page cache, inside a rolled back transaction."""
+        factory = RequestFactory()
+        view = ProductListView.as_view()
+        url = reverse("catalog:product-list")
+        with transaction.atomic():
+            if synthetic:
+                self.seed_products(synthetic)
+            customer = Customer.objects.create_user(
+                email="benchmark@example.com", password=None
+            )
+            customer.wishlist.set(Product.objects.all()[:3])
+
+            timings = []
+            for _ in range(repeat):
+                request = factory.get(url, {"available": "1", "price": "0-500"})
+                request.user = customer
+                request.session = {}
+                response = view(request)
+                started = time.perf_counter()
+                response.render()
+                timings.append(time.perf_counter() - started)
+            self.report("product_list render", timings)
+            transaction.set_rollback(True)
+
+    def seed_products(self, count):
+        categories = [value for value, _ in Product.CATEGORY_CHOICES]
+        Product.objects.bulk_create((
+            Product(
+                name=" ".join(random.sample(WORDS, 3)),
+                category=categories[number % len(categories)],
+                product_number=(
+                    int(categories[number % len(categories)]) * 10_000_000 + number
+                ),
+                slug=f"benchmark-{number}",
+                price_low=1,
+                price_high=2,
+                available=number % 5 != 0,
+            )
+            for number in range(count)
+        ), batch_size=1000)
+
+    def synthetic_rows(self, count):
+        rows = []
+        for number in range(10001, 10001 + count):
+            name = " ".join(random.sample(WORDS, 3)) + f" {number % 997}"
+            slug = f"{number}-product"
+            rows.append((PRODUCT, name, slug))
+            rows.append((NUMBER, str(number), slug))
+        rows.append((COUNTRY, "Німеччина", "Germany"))
+        return rows
+
+    def report(self, name, timings):
+        timings = sorted(timing * 1000 for timing in timings)
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(
+            f"{name}: p50 {statistics.median(timings):.3f} мс, "
+            f"p99 {p99:.3f} мс, max {timings[-1]:.3f} мс"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.generation import CATALOG, WISHLIST, bump_generation
+
+
+class Command(BaseCommand):
+    help = "Скидання кешу каталогу без видалення ключів"
+
+    def add_arguments(self, parser):
+        parser.add_argument("scopes", nargs="*", default=[CATALOG])
+
+    def handle(self, *args, **options):
+        for scope in options["scopes"]:
+            if scope not in (CATALOG, WISHLIST):
+                raise CommandError(f"Невідома область кешу: {scope}")
+            generation = bump_generation(scope)
+            self.stdout.write(f"Покоління кешу {scope}: {generation}")
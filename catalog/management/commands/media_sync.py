@@ -1,7 +1,7 @@
 import os
 from django.core.management.base import BaseCommand
 
-from catalog.models import Product, ProductImage
+from catalog.models import Product, ProductImage, update_main_images
 
 MEDIA_ROOT = os.path.join("media", "product_images")
 
@@ -13,6 +13,7 @@ class Command(BaseCommand):
         self.add_new_images()
         self.cleanup_missing_images()
         self.delete_duplicates()
+        self.update_main_images()
 
     def add_new_images(self):
         categories = [item[0] for item in Product.CATEGORY_CHOICES]
@@ -90,6 +91,6 @@ class Command(BaseCommand):
             else:
                 product_images_dict[product_number].add(image_path)
 
-
-
-
+    def update_main_images(self):
+        update_main_images(Product.objects.all())
+        print("Основні зображення товарів оновлено")
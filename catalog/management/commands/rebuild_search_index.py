@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from catalog.search import get_search_backend
+from catalog.search.index import product_index
+
+
+class Command(BaseCommand):
+    help = "Перебудова пошукових індексів каталогу"
+
+    def handle(self, *args, **options):
+        get_search_backend().rebuild()
+        product_index.rebuild()
+
+        stats = product_index.stats()
+        self.stdout.write(
+            f'Індекс у памʼяті: {stats["documents"]} товарів, '
+            f'{stats["terms"]} термінів, '
+            f'{stats["memory_bytes"] / 1024 / 1024:.1f} МБ, '
+            f'побудовано за {stats["rebuild_seconds"] * 1000:.0f} мс'
+        )
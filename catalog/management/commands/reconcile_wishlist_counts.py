@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from catalog.models import Product, update_wishlist_counts
+
+
+class Command(BaseCommand):
+    help = "Перерахунок кількості вподобань товарів"
+
+    def handle(self, *args, **options):
+        corrected = update_wishlist_counts(Product._base_manager.all())
+        self.stdout.write(f"Виправлено лічильників вподобань: {corrected}")
@@ -1,4 +1,49 @@
 from django.contrib.auth.base_user import BaseUserManager
+from django.db import models
+from django.utils import timezone
+
+from catalog.generation import bump_generation
+
+
+class CatalogQuerySet(models.QuerySet):
+    """QuerySet that bumps the catalog generation on bulk writes.
+
+    Bulk writes send no model signals, so the signal receivers never see them.
+    update() and bulk_update() also stamp updated_at, which auto_now only
+    does on save().
+    """
+
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        rows = super().update(**kwargs)
+        bump_generation()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        bump_generation()
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if "updated_at" not in fields:
+            objs = list(objs)
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, "updated_at"]
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        bump_generation()
+        return rows
+
+
+class ProductQuerySet(CatalogQuerySet):
+    def published(self):
+        return self.filter(is_published=True)
+
+
+class CategoryProductManager(models.Manager.from_queryset(ProductQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.model.CATEGORY)
 
 
 class CustomerManager(BaseUserManager):
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.5 on 2026-10-17 12:07
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from catalog.operations import VendorRunSQL
+from catalog.search import get_search_backend
+
+
+def rebuild_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).rebuild(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0012_alter_product_options_alter_productimage_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        VendorRunSQL(
+            "postgresql",
+            sql="CREATE INDEX catalog_product_search_vector_gin "
+            "ON catalog_product USING gin (search_vector);",
+            reverse_sql="DROP INDEX IF EXISTS catalog_product_search_vector_gin;",
+        ),
+        VendorRunSQL(
+            "sqlite",
+            sql="CREATE VIRTUAL TABLE catalog_product_fts USING fts5("
+            "name, country, description, product_number, "
+            "tokenize = 'unicode61 remove_diacritics 2');",
+            reverse_sql="DROP TABLE IF EXISTS catalog_product_fts;",
+        ),
+        migrations.RunPython(rebuild_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from catalog.operations import OptionalExtension, VendorRunSQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0013_product_search_vector"),
+    ]
+
+    operations = [
+        OptionalExtension("pg_trgm"),
+        VendorRunSQL(
+            "postgresql",
+            sql=[
+                "CREATE INDEX catalog_product_name_trgm "
+                "ON catalog_product USING gin (name gin_trgm_ops);",
+                "CREATE INDEX catalog_country_ua_name_trgm "
+                "ON catalog_country USING gin (ua_name gin_trgm_ops);",
+                "CREATE INDEX catalog_country_en_name_trgm "
+                "ON catalog_country USING gin (en_name gin_trgm_ops);",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS catalog_product_name_trgm;",
+                "DROP INDEX IF EXISTS catalog_country_ua_name_trgm;",
+                "DROP INDEX IF EXISTS catalog_country_en_name_trgm;",
+            ],
+            extension="pg_trgm",
+        ),
+    ]
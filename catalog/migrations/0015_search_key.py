@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+from catalog.operations import VendorRunSQL
+from catalog.search.normalize import make_search_key
+
+
+def fill_search_keys(apps, schema_editor):
+    Country = apps.get_model("catalog", "Country")
+    Product = apps.get_model("catalog", "Product")
+
+    countries = list(Country.objects.all())
+    for country in countries:
+        country.search_key = make_search_key(country.ua_name, country.en_name)
+    Country.objects.bulk_update(countries, ["search_key"])
+
+    products = list(Product.objects.select_related("country"))
+    for product in products:
+        country_names = (
+            (product.country.ua_name, product.country.en_name)
+            if product.country else ()
+        )
+        product.search_key = make_search_key(
+            product.name, product.product_number, product.description, *country_names
+        )
+    Product.objects.bulk_update(products, ["search_key"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0014_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="country",
+            name="search_key",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="search_key",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+        VendorRunSQL(
+            "postgresql",
+            sql=[
+                "CREATE INDEX catalog_product_search_key_trgm "
+                "ON catalog_product USING gin (search_key gin_trgm_ops);",
+                "CREATE INDEX catalog_country_search_key_trgm "
+                "ON catalog_country USING gin (search_key gin_trgm_ops);",
+            ],
+            reverse_sql=[
+                "DROP INDEX IF EXISTS catalog_product_search_key_trgm;",
+                "DROP INDEX IF EXISTS catalog_country_search_key_trgm;",
+            ],
+            extension="pg_trgm",
+        ),
+    ]
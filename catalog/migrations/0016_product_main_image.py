@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+
+
+def fill_main_images(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductImage = apps.get_model("catalog", "ProductImage")
+
+    latest_main_images = ProductImage.objects.filter(is_main=True).values(
+        "product"
+        ).annotate(latest=Max("pk")).values("latest")
+    ProductImage.objects.filter(is_main=True).exclude(
+        pk__in=latest_main_images
+        ).update(is_main=False)
+
+    images = ProductImage.objects.filter(
+        product=OuterRef("pk")
+        ).order_by("-is_main", "pk")
+    Product.objects.update(main_image=Subquery(images.values("pk")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0015_search_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="main_image",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="catalog.productimage",
+                verbose_name="основне зображення",
+            ),
+        ),
+        migrations.RunPython(fill_main_images, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="productimage",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_main", True)),
+                fields=("product",),
+                name="catalog_productimage_single_main",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+def hide_test_products(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    Product.objects.filter(name__icontains="test").update(is_published=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0017_product_list_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="is_published",
+            field=models.BooleanField(default=True, verbose_name="опубліковано"),
+        ),
+        migrations.RunPython(hide_test_products, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_visible_avail_idx",
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["-available", "-id"],
+                name="product_visible_avail_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+CATEGORY_TABLES = (
+    ("1", "catalog_clothing"),
+    ("2", "catalog_footwear"),
+    ("3", "catalog_accessory"),
+)
+
+
+def copy_categories_to_products(apps, schema_editor):
+    quote_name = schema_editor.quote_name
+    for category, table in CATEGORY_TABLES:
+        schema_editor.execute(
+            f"UPDATE {quote_name('catalog_product')} SET category = %s "
+            f"WHERE id IN (SELECT product_ptr_id FROM {quote_name(table)})",
+            [category],
+        )
+
+
+def copy_products_to_category_tables(apps, schema_editor):
+    quote_name = schema_editor.quote_name
+    for category, table in CATEGORY_TABLES:
+        schema_editor.execute(
+            f"INSERT INTO {quote_name(table)} (product_ptr_id) "
+            f"SELECT id FROM {quote_name('catalog_product')} WHERE category = %s",
+            [category],
+        )
+
+
+def proxy_model(name, verbose_name, verbose_name_plural):
+    return migrations.CreateModel(
+        name=name,
+        fields=[],
+        options={
+            "verbose_name": verbose_name,
+            "verbose_name_plural": verbose_name_plural,
+            "proxy": True,
+            "indexes": [],
+            "constraints": [],
+        },
+        bases=("catalog.product",),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0018_product_is_published"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            copy_categories_to_products, copy_products_to_category_tables
+        ),
+        migrations.DeleteModel(name="Accessory"),
+        migrations.DeleteModel(name="Clothing"),
+        migrations.DeleteModel(name="Footwear"),
+        proxy_model("Accessory", "аксесуар", "аксесуари"),
+        proxy_model("Clothing", "одяг", "одяг"),
+        proxy_model("Footwear", "взуття", "взуття"),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+from catalog.collation import sort_key
+
+
+def fill_sort_keys(apps, schema_editor):
+    Country = apps.get_model("catalog", "Country")
+
+    countries = list(Country.objects.all())
+    for country in countries:
+        country.ua_sort_key = sort_key(country.ua_name)
+    Country.objects.bulk_update(countries, ["ua_sort_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0020_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="country",
+            name="ua_sort_key",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(fill_sort_keys, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name="country",
+            options={
+                "ordering": ["ua_sort_key"],
+                "verbose_name": "країна",
+                "verbose_name_plural": "країни",
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Turn the automatic wishlist through table into WishlistItem.
+
+    The table, its columns and its unique index already exist, so the model
+    is only created in the migration state. The proxy used by the customer
+    admin is recreated on top of the new model.
+    """
+
+    dependencies = [
+        ("catalog", "0021_country_ua_sort_key"),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name="WishlistThroughProxy",
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="WishlistItem",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "customer",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                        (
+                            "product",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                to="catalog.product",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "db_table": "catalog_customer_wishlist",
+                        "unique_together": {("customer", "product")},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name="customer",
+                    name="wishlist",
+                    field=models.ManyToManyField(
+                        related_name="customers",
+                        through="catalog.WishlistItem",
+                        to="catalog.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="wishlistitem",
+            name="added_at",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name="додано",
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="wishlistitem",
+            index=models.Index(
+                fields=["customer", "-added_at"], name="wishlist_customer_added_idx"
+            ),
+        ),
+        migrations.CreateModel(
+            name="WishlistThroughProxy",
+            fields=[],
+            options={
+                "verbose_name": "товар",
+                "verbose_name_plural": "список бажань",
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("catalog.wishlistitem",),
+        ),
+    ]
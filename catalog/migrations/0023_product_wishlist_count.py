@@ -0,0 +1,37 @@
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_wishlist_counts(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    WishlistItem = apps.get_model("catalog", "WishlistItem")
+
+    counts = WishlistItem.objects.filter(product=OuterRef("pk")).order_by().values(
+        "product"
+        ).annotate(count=Count("pk")).values("count")
+    Product.objects.update(wishlist_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0022_wishlist_item"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="wishlist_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="вподобань"
+            ),
+        ),
+        migrations.RunPython(fill_wishlist_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["-wishlist_count", "-id"], name="product_wishlist_count_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fill_sequences(apps, schema_editor):
+    Product = apps.get_model("catalog", "Product")
+    ProductNumberSequence = apps.get_model("catalog", "ProductNumberSequence")
+
+    last_numbers = dict(Product.objects.values_list("category").annotate(
+        Max("product_number")
+        ).order_by())
+    ProductNumberSequence.objects.bulk_create(
+        ProductNumberSequence(
+            category=category,
+            last_number=last_numbers.get(category) or int(category + "0000"),
+        )
+        for category in ("1", "2", "3")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0023_product_wishlist_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductNumberSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[("1", "Одяг"), ("2", "Взуття"), ("3", "Аксесуари")],
+                        max_length=2,
+                        unique=True,
+                        verbose_name="категорія",
+                    ),
+                ),
+                (
+                    "last_number",
+                    models.IntegerField(verbose_name="останній код товару"),
+                ),
+            ],
+            options={
+                "verbose_name": "лічильник кодів товарів",
+                "verbose_name_plural": "лічильники кодів товарів",
+            },
+        ),
+        migrations.RunPython(fill_sequences, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,22 @@
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
-from django.utils.functional import cached_property
 from slugify import slugify
 
-from catalog.managers import CustomerManager
+from catalog.collation import sort_key
+from catalog.managers import (
+    CatalogQuerySet,
+    CategoryProductManager,
+    CustomerManager,
+    ProductQuerySet,
+)
+from catalog.search import get_search_backend
+from catalog.search.normalize import make_search_key
 
 
 class Country(models.Model):
@@ -16,6 +26,11 @@ class Country(models.Model):
         verbose_name="назва англійською"
         )
     ua_name = models.CharField(max_length=60, unique=True, verbose_name="країна")
+    ua_sort_key = models.TextField(blank=True, default="", editable=False)
+    search_key = models.TextField(blank=True, default="", editable=False)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="змінено")
+
+    objects = CatalogQuerySet.as_manager()
 
     def save(self, *args, **kwargs):
         if self.en_name != self.en_name.upper():
@@ -24,13 +39,26 @@ class Country(models.Model):
         if self.ua_name != self.ua_name.upper():
             self.ua_name = self.ua_name.capitalize()
 
+        self.ua_sort_key = sort_key(self.ua_name)
+        self.search_key = make_search_key(self.ua_name, self.en_name)
+        if self.pk:
+            self.update_product_search_keys()
         super().save(*args, **kwargs)
+        get_search_backend().update_country(self)
+
+    def update_product_search_keys(self, deleting=False):
+        products = list(Product.objects.filter(country=self))
+        for product in products:
+            product.country = None if deleting else self
+            product.search_key = product.get_search_key()
+        Product.objects.bulk_update(products, ["search_key"])
+        return [product.pk for product in products]
 
     def __str__(self):
         return self.ua_name
 
     class Meta:
-        ordering = ["ua_name"]
+        ordering = ["ua_sort_key"]
         verbose_name = "країна"
         verbose_name_plural = "країни"
 
@@ -60,6 +88,8 @@ class Product(models.Model):
         verbose_name="ціна до"
     )
     available = models.BooleanField(default=True, verbose_name="в наявності")
+    is_published = models.BooleanField(default=True, verbose_name="опубліковано")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="змінено")
     category = models.CharField(
         max_length=2, 
         choices=CATEGORY_CHOICES, 
@@ -71,14 +101,32 @@ class Product(models.Model):
         editable=False
         )
     slug = models.SlugField(null=False, blank=False, unique=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_key = models.TextField(blank=True, default="", editable=False)
+    main_image = models.ForeignKey(
+        "ProductImage",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name="основне зображення",
+    )
+    wishlist_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name="вподобань"
+    )
+
+    SQL_MAINTAINED_FIELDS = ("wishlist_count", "main_image")
 
-    @cached_property
-    def main_image(self):
-        images = list(self.images.all())
-        for image in images:
-            if image.is_main:
-                return image
-        return images[0] if images else None
+    objects = ProductQuerySet.as_manager()
+
+    def get_search_key(self):
+        country_names = (
+            (self.country.ua_name, self.country.en_name) if self.country else ()
+        )
+        return make_search_key(
+            self.name, self.product_number, self.description, *country_names
+        )
 
     def __str__(self):
         return f"{self.product_number} {self.name}"
@@ -87,6 +135,25 @@ class Product(models.Model):
         ordering = ["-available", "-id"]
         verbose_name = "товар"
         verbose_name_plural = "товари"
+        indexes = [
+            models.Index(fields=["-available", "-id"], name="product_available_id_idx"),
+            models.Index(
+                fields=["category", "-available", "-id"],
+                name="product_category_avail_idx",
+            ),
+            models.Index(
+                fields=["country", "-available", "-id"],
+                name="product_country_avail_idx",
+            ),
+            models.Index(
+                fields=["-available", "-id"],
+                name="product_visible_avail_idx",
+                condition=Q(is_published=True),
+            ),
+            models.Index(
+                fields=["-wishlist_count", "-id"], name="product_wishlist_count_idx"
+            ),
+        ]
     
     def clean(self):
         if not self.price_high or not self.price_low:
@@ -100,13 +167,16 @@ class Product(models.Model):
             raise ValidationError("Об'єкти можна створювати тільки через "\
                                   "моделі-нащадки: Clothing, Footwear, Accessory")
         
-        if not self.product_number:
-            product_objects = Product.objects.filter(category=self.category)
-            last_product = product_objects.order_by("product_number").last()
-            if last_product:
-                self.product_number = last_product.product_number + 1
-            else:
-                self.product_number = int(self.category + "0001")
+        if self._state.adding:
+            if not self.product_number:
+                self.product_number = ProductNumberSequence.reserve(
+                    self.category
+                    )[0]
+            elif not ProductNumberSequence.is_reserved(
+                self.category, self.product_number
+                ):
+                raise ValidationError("Код товару не зарезервовано для "\
+                                      "категорії товару!")
 
         else:
             db_product = Product.objects.get(pk=self.pk)
@@ -114,21 +184,91 @@ class Product(models.Model):
                 raise ValidationError("Код товару змінювати заборонено!")
             if db_product.category and db_product.category != self.category:
                 raise ValidationError("Категорію товару змінювати заборонено!")
+            kwargs["update_fields"] = self.get_update_fields(
+                kwargs.get("update_fields")
+                )
 
         slug_name = f"{self.product_number}-{self.name}"
         if not self.slug or self.slug != slug_name:
             self.slug = slugify(slug_name, separator="-", lowercase=True)
 
+        self.search_key = self.get_search_key()
         self.full_clean()
         super().save(*args, **kwargs)
+        get_search_backend().update_product(self)
+
+    def get_update_fields(self, update_fields=None):
+        """Fields to write on save, without the ones kept up to date in SQL.
+
+        wishlist_count and main_image are changed with F()/subquery updates,
+        so writing back a value read earlier could undo a concurrent change.
+        """
+        if update_fields is None:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+            ]
+        return [
+            name for name in update_fields
+            if name not in self.SQL_MAINTAINED_FIELDS
+        ]
 
     def get_absolute_url(self):
         return reverse("catalog:product-detail", args=[self.slug])
 
 
+class ProductNumberSequence(models.Model):
+    """Last product number handed out in each category."""
+
+    category = models.CharField(
+        max_length=2, 
+        choices=Product.CATEGORY_CHOICES, 
+        unique=True, 
+        verbose_name="категорія",
+        )
+    last_number = models.IntegerField(verbose_name="останній код товару")
+
+    @classmethod
+    def reserve(cls, category, count=1):
+        """Reserve count consecutive product numbers and return them as a range.
+
+        The UPDATE locks the category row until the transaction ends, so
+        concurrent saves and imports never get the same numbers.
+        """
+        with transaction.atomic(savepoint=False):
+            sequences = cls.objects.filter(category=category)
+            if not sequences.update(last_number=F("last_number") + count):
+                last_number = Product.objects.filter(category=category).aggregate(
+                    Max("product_number")
+                    )["product_number__max"]
+                cls.objects.get_or_create(
+                    category=category,
+                    defaults={"last_number": last_number or int(category + "0000")},
+                )
+                sequences.update(last_number=F("last_number") + count)
+            last_number = sequences.values_list("last_number", flat=True).get()
+        return range(last_number - count + 1, last_number + 1)
+
+    @classmethod
+    def is_reserved(cls, category, number):
+        """Whether number lies in the category's range and was handed out."""
+        number = int(number)
+        if not int(category + "0000") < number <= int(category + "9999"):
+            return False
+        return cls.objects.filter(
+            category=category, last_number__gte=number
+            ).exists()
+
+    class Meta:
+        verbose_name = "лічильник кодів товарів"
+        verbose_name_plural = "лічильники кодів товарів"
+
+
 class Clothing(Product):
     CATEGORY = "1"
 
+    objects = CategoryProductManager()
+
     def save(self, *args, **kwargs):
         if self.category and self.category != self.CATEGORY:
             raise ValidationError("Категорію товару змінювати заборонено!")
@@ -137,12 +277,15 @@ class Clothing(Product):
         super().save(*args, **kwargs)
 
     class Meta:
+        proxy = True
         verbose_name = "одяг"
         verbose_name_plural = "одяг"
 
 
 class Footwear(Product):
     CATEGORY = "2"
+
+    objects = CategoryProductManager()
     
     def save(self, *args, **kwargs):
         if self.category and self.category != self.CATEGORY:
@@ -152,6 +295,7 @@ class Footwear(Product):
         super().save(*args, **kwargs)
 
     class Meta:
+        proxy = True
         verbose_name = "взуття"
         verbose_name_plural = "взуття"
 
@@ -159,6 +303,8 @@ class Footwear(Product):
 class Accessory(Product):
     CATEGORY = "3"
 
+    objects = CategoryProductManager()
+
     def save(self, *args, **kwargs):
         if self.category and self.category != self.CATEGORY:
             raise ValidationError("Категорію товару змінювати заборонено!")
@@ -167,6 +313,7 @@ class Accessory(Product):
         super().save(*args, **kwargs)
 
     class Meta:
+        proxy = True
         verbose_name = "аксесуар"
         verbose_name_plural = "аксесуари"
 
@@ -189,6 +336,9 @@ class ProductImage(models.Model):
         unique=True
         )
     is_main = models.BooleanField(default=False, verbose_name="основне зображення")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="змінено")
+
+    objects = CatalogQuerySet.as_manager()
         
     def save(self, *args, **kwargs):
         if self.image and isinstance(self.image.name, str):
@@ -201,6 +351,8 @@ class ProductImage(models.Model):
                 )
             previous_main_image.exclude(pk=self.pk).update(is_main=False)
         super().save(*args, **kwargs)
+        update_main_images(Product.objects.filter(pk=self.product_id))
+        self.product.refresh_from_db(fields=["main_image"])
 
     def __str__(self):
         return f"Зображення: {self.product}"
@@ -208,12 +360,41 @@ class ProductImage(models.Model):
     class Meta:
         verbose_name = "зображення"
         verbose_name_plural = "зображення"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product"],
+                condition=Q(is_main=True),
+                name="catalog_productimage_single_main",
+            ),
+        ]
+
+
+def update_main_images(products):
+    """Point main_image of the products at the is_main image or the first one."""
+    images = ProductImage.objects.filter(
+        product=OuterRef("pk")
+        ).order_by("-is_main", "pk")
+    products.update(main_image=Subquery(images.values("pk")[:1]))
+
+
+def update_wishlist_counts(products):
+    """Recount wishlist_count of the products that are out of date.
+
+    Returns the number of corrected products. Pass a queryset of
+    Product._base_manager to keep the catalog generation.
+    """
+    counts = WishlistItem.objects.filter(product=OuterRef("pk")).order_by()\
+        .values("product").annotate(count=Count("pk")).values("count")
+    count = Coalesce(Subquery(counts), 0)
+    return products.exclude(wishlist_count=count).update(wishlist_count=count)
 
 
 class Customer(AbstractUser):
     username = None
     email = models.EmailField(unique=True)
-    wishlist = models.ManyToManyField(Product, related_name="customers")
+    wishlist = models.ManyToManyField(
+        Product, through="WishlistItem", related_name="customers"
+        )
 
     objects = CustomerManager()
 
@@ -226,3 +407,18 @@ class Customer(AbstractUser):
     class Meta:
         verbose_name = "клієнт"
         verbose_name_plural = "клієнти"
+
+
+class WishlistItem(models.Model):
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    added_at = models.DateTimeField(auto_now_add=True, verbose_name="додано")
+
+    class Meta:
+        db_table = "catalog_customer_wishlist"
+        unique_together = [("customer", "product")]
+        indexes = [
+            models.Index(
+                fields=["customer", "-added_at"], name="wishlist_customer_added_idx"
+            ),
+        ]
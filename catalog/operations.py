@@ -0,0 +1,70 @@
+from django.contrib.postgres.operations import CreateExtension
+from django.db import migrations
+
+
+def extension_available(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = %s", [name]
+        )
+        return cursor.fetchone() is not None
+
+
+def extension_installed(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = %s", [name])
+        return cursor.fetchone() is not None
+
+
+class VendorRunSQL(migrations.RunSQL):
+    """RunSQL that is applied only on the given database vendor.
+
+    With extension set, it is also skipped when that PostgreSQL extension
+    is not installed, for example on servers without pg_trgm.
+    """
+
+    def __init__(self, vendor, *args, extension=None, **kwargs):
+        self.vendor = vendor
+        self.extension = extension
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, args, kwargs = super().deconstruct()
+        if self.extension is not None:
+            kwargs["extension"] = self.extension
+        return name, [self.vendor, *args], kwargs
+
+    def applies_to(self, connection):
+        if connection.vendor != self.vendor:
+            return False
+        return self.extension is None or extension_installed(
+            connection, self.extension
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if self.applies_to(schema_editor.connection):
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f"Raw SQL operation ({self.vendor} only)"
+
+
+class OptionalExtension(CreateExtension):
+    """CreateExtension that skips other vendors and servers without it."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        connection = schema_editor.connection
+        if (connection.vendor == "postgresql"
+                and extension_available(connection, self.name)):
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return f"Creates extension {self.name} if it is available"
@@ -0,0 +1,128 @@
+from calendar import timegm
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from catalog.generation import WISHLIST, get_generation, make_cache_key
+from catalog.search.normalize import normalize
+
+
+def normalize_query(params):
+    """Sorted non-empty query parameters with the search input normalized."""
+    items = []
+    for key in sorted(params):
+        for value in params.getlist(key):
+            if key == "search_input":
+                value = normalize(value).strip()
+            if value:
+                items.append((key, value))
+    return tuple(items)
+
+
+def make_etag(*parts):
+    """ETag for a page of the current catalog generation."""
+    return quote_etag(make_cache_key("etag", *parts).replace(":", "-"))
+
+
+def user_parts(request):
+    """ETag parts for pages that show the wishlist and a CSRF token.
+
+    The CSRF secret is rotated on login, so a page cached before a
+    logout/login never comes back with a stale token.
+    """
+    if not request.user.is_authenticated:
+        return ()
+    return (
+        request.user.pk,
+        get_generation(WISHLIST),
+        request.META.get("CSRF_COOKIE"),
+    )
+
+
+def conditional_response(request, response, etag, last_modified=None):
+    """Answer 304/412 from the validators, otherwise add them to response()."""
+    timestamp = None
+    if last_modified is not None:
+        timestamp = timegm(last_modified.utctimetuple())
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = response()
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if timestamp is not None:
+            response.headers.setdefault("Last-Modified", http_date(timestamp))
+    return response
+
+
+class PageCacheKeyMixin:
+    def get_page_cache_parts(self):
+        return self.request.path, normalize_query(self.request.GET)
+
+
+class ConditionalGetMixin(PageCacheKeyMixin):
+    """Answer conditional GET requests with 304 before running any query.
+
+    The ETag is built from the catalog generation, so it changes with any
+    catalog write. Logged in users also get their own ETag, because pages
+    show their wishlist and their CSRF token.
+    """
+
+    def get_etag(self):
+        return make_etag(
+            *self.get_page_cache_parts(), *user_parts(self.request)
+        )
+
+    def get_last_modified(self):
+        return None
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        return conditional_response(
+            request,
+            lambda: super(ConditionalGetMixin, self).dispatch(
+                request, *args, **kwargs
+            ),
+            self.get_etag(),
+            self.get_last_modified(),
+        )
+
+
+class AnonymousPageCacheMixin(PageCacheKeyMixin):
+    """Serve rendered GET responses to anonymous users from the cache.
+
+    Keys embed the catalog generation, so any catalog write makes every
+    cached page stale at once. Authenticated users always get a fresh page
+    because it shows their wishlist.
+    """
+
+    cache_anonymous_pages = True
+
+    def dispatch(self, request, *args, **kwargs):
+        if (not self.cache_anonymous_pages or request.method != "GET"
+                or request.user.is_authenticated):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = make_cache_key("page", *self.get_page_cache_parts())
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            if hasattr(response, "add_post_render_callback"):
+                response.add_post_render_callback(
+                    lambda rendered: cache.set(
+                        key, rendered, settings.CATALOG_CACHE_TIMEOUT
+                    )
+                )
+            else:
+                cache.set(key, response, settings.CATALOG_CACHE_TIMEOUT)
+        return response
@@ -0,0 +1,236 @@
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+from catalog.generation import WISHLIST, get_generation, make_cache_key
+
+NEXT = "n"
+PREVIOUS = "p"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_cursor(value):
+    """Return (direction, available, id) for a "n1-523" style cursor or None."""
+    if not value or value[0] not in (NEXT, PREVIOUS):
+        return None
+    available, _, pk = value[1:].partition("-")
+    if available not in ("0", "1") or not pk.isdigit():
+        return None
+    return value[0], available == "1", int(pk)
+
+
+def make_cursor(direction, product):
+    return f"{direction}{int(product.available)}-{product.pk}"
+
+
+class KeysetPage:
+    """Page of a keyset paginator with the interface used by pagination.html.
+
+    The "page numbers" are cursors, so the template keeps passing them back
+    through the page query parameter.
+    """
+
+    number = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self.paginator.make_cursor(NEXT, self.object_list[-1])
+
+    def previous_page_number(self):
+        return self.paginator.make_cursor(PREVIOUS, self.object_list[0])
+
+
+class KeysetPaginator:
+    """Paginates by the ("-available", "-id") ordering without OFFSET or COUNT."""
+
+    ordering = ("-available", "-id")
+    num_pages = None
+    count = None
+
+    parse_cursor = staticmethod(parse_cursor)
+    make_cursor = staticmethod(make_cursor)
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    @classmethod
+    def supports(cls, queryset):
+        if not isinstance(queryset, QuerySet):
+            return False
+        if queryset.query.order_by:
+            return tuple(queryset.query.order_by) == cls.ordering
+        return (queryset.query.default_ordering
+                and tuple(queryset.model._meta.ordering) == cls.ordering)
+
+    def keyset_filter(self, lookup, first, second):
+        """Rows before ("lt") or after ("gt") a (first, second) key."""
+        first_field, second_field = (name[1:] for name in self.ordering)
+        return (Q(**{f"{first_field}__{lookup}": first})
+                | Q(**{first_field: first, f"{second_field}__{lookup}": second}))
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor is None:
+            rows = list(queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page,
+                              False)
+
+        direction, first, second = cursor
+        if direction == NEXT:
+            rows = list(queryset.filter(
+                self.keyset_filter("lt", first, second)
+            )[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page,
+                              bool(rows))
+
+        rows = list(queryset.filter(
+            self.keyset_filter("gt", first, second)
+        ).order_by(*(name[1:] for name in self.ordering))[:self.per_page + 1])
+        return KeysetPage(rows[:self.per_page][::-1], self, bool(rows),
+                          len(rows) > self.per_page)
+
+
+class WishlistKeysetPaginator(KeysetPaginator):
+    """Paginates wishlist products newest first by (added_at, item id) cursors.
+
+    The queryset must annotate wishlist_added_at and wishlist_item_id from
+    the customer's wishlist item. Cursors look like "n1760700000123456-42",
+    with added_at in microseconds since the epoch.
+    """
+
+    ordering = ("-wishlist_added_at", "-wishlist_item_id")
+
+    @staticmethod
+    def parse_cursor(value):
+        if not value or value[0] not in (NEXT, PREVIOUS):
+            return None
+        added_at, _, pk = value[1:].partition("-")
+        if not added_at.isdigit() or not pk.isdigit():
+            return None
+        try:
+            added_at = EPOCH + timedelta(microseconds=int(added_at))
+        except OverflowError:
+            return None
+        return value[0], added_at, int(pk)
+
+    @staticmethod
+    def make_cursor(direction, product):
+        added_at = (product.wishlist_added_at - EPOCH) // timedelta(microseconds=1)
+        return f"{direction}{added_at}-{product.wishlist_item_id}"
+
+
+class KeysetPaginationMixin:
+    """Use keyset pagination for list views when it is enabled and possible.
+
+    Numeric page numbers, for example from old links, and querysets with
+    another ordering, such as ranked search results, keep the regular
+    paginator.
+    """
+
+    pagination_mode = None
+    keyset_paginator_class = KeysetPaginator
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.CATALOG_PAGINATION_MODE
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator_class = self.keyset_paginator_class
+        page = self.request.GET.get(self.page_kwarg)
+        cursor = paginator_class.parse_cursor(page)
+        if (self.get_pagination_mode() != "keyset"
+                or (page and cursor is None)
+                or not paginator_class.supports(queryset)):
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = paginator_class(queryset, page_size)
+        page = paginator.page(cursor)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches COUNT(*) results until the next catalog write.
+
+    Unfiltered querysets over large PostgreSQL tables are counted with the
+    planner's estimate from pg_class.reltuples instead.
+    """
+
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        estimate = self.get_estimated_count(queryset)
+        if estimate is not None:
+            return estimate
+
+        try:
+            key = make_cache_key("count", *self.get_cache_parts(queryset))
+        except EmptyResultSet:
+            return 0
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, settings.CATALOG_CACHE_TIMEOUT)
+        return count
+
+    def get_cache_parts(self, queryset):
+        query = queryset.order_by().query
+        sql, params = query.sql_with_params()
+        return queryset.db, sql, params
+
+    def get_estimated_count(self, queryset):
+        connection = connections[queryset.db]
+        query = queryset.query
+        if (connection.vendor != "postgresql" or query.has_filters()
+                or query.distinct or query.is_sliced):
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < self.estimate_threshold:
+            return None
+        return row[0]
+
+
+class WishlistCountPaginator(CachedCountPaginator):
+    """Cached count that also goes stale when any wishlist changes."""
+
+    def get_cache_parts(self, queryset):
+        return super().get_cache_parts(queryset) + (get_generation(WISHLIST),)
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from catalog.search.backends import get_search_backend, search_products
+from catalog.search.index import product_index
+
+__all__ = ["get_search_backend", "search_products", "warm_up_search_index"]
+
+
+def warm_up_search_index():
+    if settings.CATALOG_SEARCH_BACKEND == "memory":
+        product_index.rebuild()
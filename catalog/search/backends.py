@@ -0,0 +1,227 @@
+from functools import reduce
+from operator import or_
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection as default_connection, connections
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+from catalog.search.index import IndexedResults, product_index
+from catalog.search.normalize import normalize, tokenize
+from catalog.search.numbers import is_product_number, product_number_q
+from catalog.search.trigram import trigram_index
+
+TRIGRAM_SUPPORT = {}
+
+
+class BaseSearchBackend:
+    fuzzy_limit = 200
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def search(self, queryset, query, scope=None):
+        raise NotImplementedError
+
+    def fuzzy_search(self, queryset, query, scope=None):
+        product_ids = trigram_index.search(query, limit=self.fuzzy_limit)
+        if not product_ids:
+            return queryset.none()
+
+        ranking = Case(
+            *(When(pk=pk, then=Value(position))
+              for position, pk in enumerate(product_ids)),
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=product_ids).annotate(
+            search_rank=ranking
+        ).order_by("search_rank")
+
+    def update_product(self, product):
+        trigram_index.update_products([product.pk])
+        self._sync("p.id = %s", [product.pk])
+
+    def update_country(self, country):
+        trigram_index.update_country(country.pk)
+        self._sync("p.country_id = %s", [country.pk])
+
+    def update_products(self, product_ids):
+        trigram_index.update_products(product_ids)
+        if product_ids:
+            placeholders = ", ".join(["%s"] * len(product_ids))
+            self._sync(f"p.id IN ({placeholders})", list(product_ids))
+
+    def rebuild(self, apps=global_apps):
+        self._sync("1 = 1", [], apps)
+
+    def _sync(self, where, params, apps=global_apps):
+        pass
+
+    def _tables(self, apps):
+        quote_name = self.connection.ops.quote_name
+        product_model = apps.get_model("catalog", "Product")
+        country_model = apps.get_model("catalog", "Country")
+        return (
+            quote_name(product_model._meta.db_table),
+            quote_name(country_model._meta.db_table),
+        )
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    def search(self, queryset, query, scope=None):
+        return queryset.filter(search_key__contains=query)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    documents = (
+        ("A", "p.name || ' ' || p.product_number::text"),
+        ("B", "coalesce(c.ua_name || ' ' || c.en_name, '')"),
+        ("C", "coalesce(p.description, '')"),
+    )
+
+    @property
+    def configs(self):
+        return tuple(dict.fromkeys([settings.CATALOG_SEARCH_CONFIG, "simple"]))
+
+    def search(self, queryset, query, scope=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        raw_query = " & ".join(f"{token}:*" for token in tokens)
+        search_query = reduce(or_, (
+            SearchQuery(raw_query, config=config, search_type="raw")
+            for config in self.configs
+        ))
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F("search_vector"), search_query)
+        ).order_by("-search_rank", "-available", "-id")
+
+    def fuzzy_search(self, queryset, query, scope=None):
+        if not self.has_trigram_extension():
+            return super().fuzzy_search(queryset, query)
+
+        fields = ("name", "country__ua_name", "country__en_name")
+        return queryset.filter(reduce(or_, (
+            Q(**{f"{field}__trigram_word_similar": query}) for field in fields
+        ))).annotate(
+            search_rank=Greatest(*(
+                TrigramWordSimilarity(query, field) for field in fields
+            ))
+        ).order_by("-search_rank", "-available", "-id")
+
+    def has_trigram_extension(self):
+        alias = self.connection.alias
+        if alias not in TRIGRAM_SUPPORT:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                TRIGRAM_SUPPORT[alias] = cursor.fetchone() is not None
+        return TRIGRAM_SUPPORT[alias]
+
+    def _sync(self, where, params, apps=global_apps):
+        product_table, country_table = self._tables(apps)
+        vectors, vector_params = [], []
+        for weight, document in self.documents:
+            for config in self.configs:
+                vectors.append(
+                    f"setweight(to_tsvector(%s::regconfig, {document}), '{weight}')"
+                )
+                vector_params.append(config)
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {product_table} AS target "
+                f"SET search_vector = {' || '.join(vectors)} "
+                f"FROM {product_table} AS p "
+                f"LEFT JOIN {country_table} AS c ON c.id = p.country_id "
+                f"WHERE p.id = target.id AND {where}",
+                vector_params + params,
+            )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    table = "catalog_product_fts"
+    rank_weights = "10.0, 5.0, 1.0, 10.0"
+
+    def search(self, queryset, query, scope=None):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        product_table, _ = self._tables(global_apps)
+        match = " ".join(f'"{token}"*' for token in tokens)
+        matched_ids = RawSQL(
+            f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]
+        )
+        rank = RawSQL(
+            f"SELECT bm25({self.table}, {self.rank_weights}) FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND rowid = {product_table}.id",
+            [match],
+        )
+        return queryset.filter(pk__in=matched_ids).annotate(
+            search_rank=rank
+        ).order_by("search_rank", "-available", "-id")
+
+    def _sync(self, where, params, apps=global_apps):
+        product_table, country_table = self._tables(apps)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"(SELECT p.id FROM {product_table} AS p WHERE {where})",
+                params,
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} "
+                f"(rowid, name, country, description, product_number) "
+                f"SELECT p.id, p.name, COALESCE(c.ua_name || ' ' || c.en_name, ''), "
+                f"COALESCE(p.description, ''), p.product_number "
+                f"FROM {product_table} AS p "
+                f"LEFT JOIN {country_table} AS c ON c.id = p.country_id "
+                f"WHERE {where}",
+                params,
+            )
+
+
+class MemorySearchBackend(BaseSearchBackend):
+    def search(self, queryset, query, scope=None):
+        return IndexedResults(queryset, product_index.search(query, scope))
+
+    def fuzzy_search(self, queryset, query, scope=None):
+        return IndexedResults(queryset, product_index.fuzzy_search(query, scope))
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+    "memory": MemorySearchBackend,
+}
+
+
+def get_search_backend(connection=None, name=None):
+    connection = connection or default_connection
+    backend_class = BACKENDS.get(name or connection.vendor, BasicSearchBackend)
+    return backend_class(connection)
+
+
+def search_products(queryset, query, scope=None):
+    backend = get_search_backend(
+        connections[queryset.db], settings.CATALOG_SEARCH_BACKEND
+        )
+    query = normalize(query).strip()
+    if is_product_number(query):
+        category = (scope or {}).get("category")
+        return queryset.filter(product_number_q(query, category))
+
+    results = backend.search(queryset, query, scope)
+    if not results.exists():
+        results = queryset.filter(search_key__contains=query)
+    if not results.exists():
+        results = backend.fuzzy_search(queryset, query, scope)
+    return results
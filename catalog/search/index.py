@@ -0,0 +1,279 @@
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+from collections.abc import Sequence
+
+from django.apps import apps
+
+from catalog.search.normalize import tokenize
+from catalog.search.sync import CatalogSync
+from catalog.search.trigram import TrigramIndex
+
+Document = namedtuple(
+    "Document", ["terms", "category", "country_id", "available", "hidden"]
+)
+
+DOCUMENT_FIELDS = (
+    "pk",
+    "name",
+    "description",
+    "product_number",
+    "category",
+    "country_id",
+    "available",
+    "is_published",
+    "country__ua_name",
+    "country__en_name",
+    "search_key",
+)
+
+
+def deep_sizeof(obj, seen=None):
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+class InvertedIndex:
+    """In-process inverted index over the searchable product fields.
+
+    Every term maps to the products that contain it together with the
+    weight of the field it came from. Terms are also kept in a sorted
+    list, so prefix queries are resolved with a binary search.
+    """
+
+    weights = {
+        "name": 3,
+        "product_number": 3,
+        "country__ua_name": 2,
+        "country__en_name": 2,
+        "description": 1,
+        "search_key": 1,
+    }
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.ready = False
+        self.postings = defaultdict(dict)
+        self.terms = []
+        self.documents = {}
+        self.trigrams = TrigramIndex()
+        self.sync = CatalogSync()
+        self.rebuild_seconds = None
+
+    def ensure_ready(self):
+        if not self.ready:
+            self.rebuild()
+        elif not self.sync.is_current():
+            self.refresh()
+
+    def invalidate(self):
+        self.ready = False
+
+    def rebuild(self):
+        started = time.perf_counter()
+        sync_state = self.sync.start()
+        product_model = apps.get_model("catalog", "Product")
+        rows = product_model.objects.values(*DOCUMENT_FIELDS)
+
+        with self.lock:
+            self.postings.clear()
+            self.documents.clear()
+            self.trigrams.clear()
+            for row in rows:
+                for term in self._add(row):
+                    self.trigrams.add_word(term, row["pk"])
+            self.terms = sorted(self.postings)
+            self.trigrams.ready = True
+            self.sync.finish(sync_state)
+            self.ready = True
+        self.rebuild_seconds = time.perf_counter() - started
+
+    def refresh(self):
+        """Catch up with catalog writes made by other processes."""
+        sync_state = self.sync.start()
+        with self.lock:
+            indexed_pks = list(self.documents)
+        self.update_products(self.sync.changed_pks(indexed_pks))
+        self.sync.finish(sync_state)
+
+    def update_products(self, pks):
+        if not self.ready:
+            return
+
+        product_model = apps.get_model("catalog", "Product")
+        rows = product_model.objects.filter(pk__in=pks).values(*DOCUMENT_FIELDS)
+        with self.lock:
+            for pk in pks:
+                self._remove(pk)
+            for row in rows:
+                for term in self._add(row):
+                    self.trigrams.add_word(term, row["pk"])
+                    position = bisect_left(self.terms, term)
+                    if position == len(self.terms) or self.terms[position] != term:
+                        self.terms.insert(position, term)
+
+    def update_country(self, country_pk):
+        if not self.ready:
+            return
+
+        product_model = apps.get_model("catalog", "Product")
+        pks = set(product_model.objects.filter(
+            country_id=country_pk
+            ).values_list("pk", flat=True))
+        pks.update(
+            pk for pk, doc in self.documents.items() if doc.country_id == country_pk
+        )
+        self.update_products(pks)
+
+    def remove_product(self, pk):
+        with self.lock:
+            self._remove(pk)
+
+    def _add(self, row):
+        terms = {}
+        for field, weight in self.weights.items():
+            for term in tokenize(str(row[field] or "")):
+                terms[term] = max(weight, terms.get(term, 0))
+
+        for term, weight in terms.items():
+            self.postings[term][row["pk"]] = weight
+        self.documents[row["pk"]] = Document(
+            terms=tuple(terms),
+            category=row["category"],
+            country_id=row["country_id"],
+            available=row["available"],
+            hidden=not row["is_published"],
+        )
+        return terms
+
+    def _remove(self, pk):
+        self.trigrams.remove_product(pk)
+        document = self.documents.pop(pk, None)
+        if document is None:
+            return
+
+        for term in document.terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(pk, None)
+            if not postings:
+                del self.postings[term]
+                position = bisect_left(self.terms, term)
+                if position < len(self.terms) and self.terms[position] == term:
+                    del self.terms[position]
+
+    def _prefix_matches(self, prefix):
+        matches = {}
+        position = bisect_left(self.terms, prefix)
+        while position < len(self.terms) and self.terms[position].startswith(prefix):
+            for pk, weight in self.postings[self.terms[position]].items():
+                if weight > matches.get(pk, 0):
+                    matches[pk] = weight
+            position += 1
+        return matches
+
+    def _matches_scope(self, pk, scope):
+        document = self.documents.get(pk)
+        if document is None or document.hidden:
+            return False
+        return all(getattr(document, key) == value for key, value in scope.items())
+
+    def _order(self, scores, scope):
+        pks = [pk for pk in scores if self._matches_scope(pk, scope)]
+        return sorted(
+            pks,
+            key=lambda pk: (-scores[pk], -self.documents[pk].available, -pk)
+        )
+
+    def search(self, query, scope=None):
+        self.ensure_ready()
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self.lock:
+            scores = None
+            for token in tokens:
+                matches = self._prefix_matches(token)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {
+                        pk: score + matches[pk]
+                        for pk, score in scores.items() if pk in matches
+                    }
+                if not scores:
+                    return []
+            return self._order(scores, scope or {})
+
+    def fuzzy_search(self, query, scope=None):
+        self.ensure_ready()
+        with self.lock:
+            ranked = self.trigrams.rank(query)
+            scores = {pk: -position for position, pk in enumerate(ranked)}
+            return self._order(scores, scope or {})
+
+    def stats(self):
+        with self.lock:
+            return {
+                "documents": len(self.documents),
+                "terms": len(self.terms),
+                "memory_bytes": deep_sizeof(
+                    (self.postings, self.terms, self.documents, self.trigrams.postings,
+                     self.trigrams.trigrams, self.trigrams.documents)
+                ),
+                "rebuild_seconds": self.rebuild_seconds,
+            }
+
+
+class IndexedResults(Sequence):
+    """Search results resolved to ids; only the requested slice is fetched."""
+
+    def __init__(self, queryset, pks):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.pks = pks
+
+    def __len__(self):
+        return len(self.pks)
+
+    def count(self):
+        return len(self.pks)
+
+    def exists(self):
+        return bool(self.pks)
+
+    def filter(self, *args, **kwargs):
+        matched = set(self.queryset.filter(pk__in=self.pks).filter(
+            *args, **kwargs
+            ).values_list("pk", flat=True))
+        return IndexedResults(self.queryset, [pk for pk in self.pks if pk in matched])
+
+    def aggregate(self, *args, **kwargs):
+        return self.queryset.filter(pk__in=self.pks).aggregate(*args, **kwargs)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0] if index >= 0 else self[len(self) + index]
+
+        pks = self.pks[index]
+        products = {product.pk: product for product in self.queryset.filter(pk__in=pks)}
+        return [products[pk] for pk in pks if pk in products]
+
+
+product_index = InvertedIndex()
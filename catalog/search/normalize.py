@@ -0,0 +1,63 @@
+import re
+
+from text_unidecode import unidecode
+
+WORD_RE = re.compile(r"[^\W_]+")
+LATIN_RE = re.compile(r"[a-z]")
+
+APOSTROPHES = str.maketrans({"’": "'", "ʼ": "'", "‘": "'", "`": "'", "´": "'"})
+
+CYRILLIC_LETTERS = set("абвгґдеєжзиіїйклмнопрстуфхцчшщьюяёъыэ")
+LATIN_TO_CYRILLIC = str.maketrans("aceiopxykmhtb", "асеіорхукмнтв")
+CYRILLIC_TO_LATIN = str.maketrans("асеіорхукмнтв", "aceiopxykmhtb")
+
+TRANSLITERATION = {
+    "shch": "щ", "zh": "ж", "kh": "х", "ts": "ц", "ch": "ч", "sh": "ш",
+    "yu": "ю", "iu": "ю", "ya": "я", "ia": "я", "ye": "є", "ie": "є", "yi": "ї",
+    "a": "а", "b": "б", "c": "ц", "d": "д", "e": "е", "f": "ф", "g": "г",
+    "h": "х", "i": "і", "j": "й", "k": "к", "l": "л", "m": "м", "n": "н",
+    "o": "о", "p": "п", "q": "к", "r": "р", "s": "с", "t": "т", "u": "у",
+    "v": "в", "w": "в", "x": "кс", "y": "и", "z": "з",
+}
+TRANSLITERATION_RE = re.compile(
+    "|".join(sorted(TRANSLITERATION, key=len, reverse=True))
+)
+
+
+def fold_word(word):
+    if word.isascii() or not LATIN_RE.search(word):
+        return word
+
+    cyrillic = sum(char in CYRILLIC_LETTERS for char in word)
+    latin = sum("a" <= char <= "z" for char in word)
+    if not cyrillic or not latin:
+        return word
+    if cyrillic >= latin:
+        return word.translate(LATIN_TO_CYRILLIC)
+    return word.translate(CYRILLIC_TO_LATIN)
+
+
+def normalize(text):
+    """Lower-case the text, unify apostrophes and fold mixed-script words."""
+    text = text.lower().translate(APOSTROPHES)
+    return WORD_RE.sub(lambda match: fold_word(match.group()), text)
+
+
+def to_latin(text):
+    return unidecode(text).lower()
+
+
+def to_cyrillic(text):
+    return TRANSLITERATION_RE.sub(lambda match: TRANSLITERATION[match.group()], text)
+
+
+def make_search_key(*texts):
+    """Normalized text followed by its Latin and Cyrillic transliterations."""
+    text = normalize(" ".join(str(text) for text in texts if text))
+    text = " ".join(text.split())
+    variants = dict.fromkeys([text, to_latin(text), to_cyrillic(text)])
+    return " ".join(variant for variant in variants if variant)
+
+
+def tokenize(text):
+    return WORD_RE.findall(normalize(text))
@@ -0,0 +1,42 @@
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db.models import Q
+
+NUMBER_DIGITS = 4
+
+
+def is_product_number(query):
+    return query.isascii() and query.isdecimal() and not query.startswith("0")
+
+
+def product_number_q(digits, category=None):
+    """Match product numbers starting with ``digits`` as unique index ranges.
+
+    Product numbers are the category code followed by four digits, so every
+    prefix maps to one contiguous range inside each category's number space.
+    """
+    product_model = apps.get_model("catalog", "Product")
+    categories = [category] if category else [
+        code for code, _ in product_model.CATEGORY_CHOICES
+        ]
+
+    ranges = []
+    for code in categories:
+        width = len(code) + NUMBER_DIGITS
+        if len(digits) > width:
+            continue
+
+        low = int(digits) * 10 ** (width - len(digits))
+        high = low + 10 ** (width - len(digits)) - 1
+        low = max(low, int(code + "0" * NUMBER_DIGITS))
+        high = min(high, int(code + "9" * NUMBER_DIGITS))
+        if low == high:
+            ranges.append(Q(product_number=low))
+        elif low < high:
+            ranges.append(Q(product_number__range=(low, high)))
+
+    if not ranges:
+        return Q(pk__in=[])
+    return reduce(or_, ranges)
@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left
+
+from django.apps import apps
+from django.urls import reverse
+
+from catalog.generation import get_generation
+from catalog.search.normalize import WORD_RE, normalize
+
+PRODUCT = "product"
+NUMBER = "number"
+COUNTRY = "country"
+
+
+class SuggestionIndex:
+    """Sorted array of normalized keys answering prefix queries with bisect.
+
+    Every word of a name gets its own key, so "зим" suggests "Бушлат
+    зимовий". The array is rebuilt lazily after catalog writes, so
+    keystrokes never reach the database. Writes from other processes are
+    noticed through the shared catalog generation.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = []
+        self.entries = []
+        self.ready = False
+        self.generation = None
+
+    def invalidate(self):
+        self.ready = False
+
+    def ensure_ready(self):
+        if not self.ready or self.generation != get_generation():
+            self.rebuild()
+
+    def rebuild(self):
+        generation = get_generation()
+        product_model = apps.get_model("catalog", "Product")
+        country_model = apps.get_model("catalog", "Country")
+
+        rows = []
+        products = product_model.objects.filter(is_published=True)
+        for name, number, slug in products.values_list(
+            "name", "product_number", "slug"
+        ):
+            rows.append((PRODUCT, name, slug))
+            rows.append((NUMBER, str(number), slug))
+        for ua_name, en_name in country_model.objects.filter(
+            products__is_published=True
+        ).distinct().values_list("ua_name", "en_name"):
+            rows.append((COUNTRY, ua_name, en_name))
+            rows.append((COUNTRY, en_name, en_name))
+        self.build(rows, generation)
+
+    def build(self, rows, generation=None):
+        entries = []
+        for kind, label, target in rows:
+            key = normalize(label)
+            for match in WORD_RE.finditer(key):
+                start = match.start()
+                entries.append((key[start:], start > 0, kind, label, target))
+        entries.sort()
+
+        with self.lock:
+            self.entries = entries
+            self.keys = [entry[0] for entry in entries]
+            self.generation = generation or get_generation()
+            self.ready = True
+
+    def suggest(self, prefix, limit=8):
+        self.ensure_ready()
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+
+        keys, entries = self.keys, self.entries
+        position = bisect_left(keys, prefix)
+        matches = []
+        while (position < len(keys) and keys[position].startswith(prefix)
+               and len(matches) < limit * 5):
+            matches.append(entries[position])
+            position += 1
+
+        matches.sort(key=lambda entry: (entry[1], len(entry[3]), entry[3]))
+        suggestions, seen = [], set()
+        for _, _, kind, label, target in matches:
+            if (kind, label) in seen:
+                continue
+            seen.add((kind, label))
+            suggestions.append(
+                {"kind": kind, "label": label, "url": self.url(kind, target)}
+            )
+            if len(suggestions) == limit:
+                break
+        return suggestions
+
+    @staticmethod
+    def url(kind, target):
+        if kind == COUNTRY:
+            return reverse("catalog:country-products-list", args=[target])
+        return reverse("catalog:product-detail", args=[target])
+
+
+suggestion_index = SuggestionIndex()
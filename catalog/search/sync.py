@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.db.models import Q
+from django.utils import timezone
+
+from catalog.generation import get_generation
+
+# Rows are stamped before their transaction commits, so every refresh also
+# looks at changes from shortly before the previous one.
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+class CatalogSync:
+    """Catalog generation and time an in-process index was last synced at.
+
+    Signals only reach the process that made the write. Other workers, and
+    commands such as media_sync, only bump the shared catalog generation, so
+    indexes compare it on every use and catch up from updated_at.
+    """
+
+    def __init__(self):
+        self.generation = None
+        self.synced_at = None
+
+    def start(self):
+        """State to pass to finish(), taken before the catalog is read."""
+        return get_generation(), timezone.now()
+
+    def finish(self, state):
+        self.generation, self.synced_at = state
+
+    def is_current(self):
+        return self.generation == get_generation()
+
+    def changed_pks(self, indexed_pks):
+        """Products changed since the last sync and indexed ones since deleted."""
+        product_model = apps.get_model("catalog", "Product")
+        since = self.synced_at - SYNC_OVERLAP
+        changed = set(product_model.objects.filter(
+            Q(updated_at__gte=since) | Q(country__updated_at__gte=since)
+            ).values_list("pk", flat=True))
+        existing = set(product_model.objects.values_list("pk", flat=True))
+        return changed | (set(indexed_pks) - existing)
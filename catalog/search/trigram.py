@@ -0,0 +1,162 @@
+import threading
+from collections import defaultdict
+
+from django.apps import apps
+
+from catalog.search.normalize import tokenize
+from catalog.search.sync import CatalogSync
+
+
+def word_trigrams(word):
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class TrigramIndex:
+    """In-process trigram index used when pg_trgm is not available.
+
+    Trigrams are indexed per distinct word, so a query only has to be
+    compared with the catalog vocabulary instead of every product. Saves
+    update the words of the affected products in place instead of
+    dropping the whole index.
+    """
+
+    threshold = 0.3
+    fields = ("name", "country__ua_name", "country__en_name")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.ready = False
+        self.trigrams = {}
+        self.postings = defaultdict(set)
+        self.documents = defaultdict(set)
+        self.words = defaultdict(set)
+        self.sync = CatalogSync()
+
+    def invalidate(self):
+        self.ready = False
+
+    def clear(self):
+        with self.lock:
+            self.trigrams.clear()
+            self.postings.clear()
+            self.documents.clear()
+            self.words.clear()
+
+    def build(self, rows, sync_state=None):
+        with self.lock:
+            self.clear()
+            for row in rows:
+                self._add_row(row)
+            self.sync.finish(sync_state or self.sync.start())
+            self.ready = True
+
+    def add_word(self, word, pk):
+        with self.lock:
+            if word not in self.trigrams:
+                trigrams = word_trigrams(word)
+                self.trigrams[word] = trigrams
+                for trigram in trigrams:
+                    self.postings[trigram].add(word)
+            self.documents[word].add(pk)
+            self.words[pk].add(word)
+
+    def remove_product(self, pk):
+        with self.lock:
+            for word in self.words.pop(pk, ()):
+                pks = self.documents.get(word)
+                if pks is None:
+                    continue
+                pks.discard(pk)
+                if not pks:
+                    self._remove_word(word)
+
+    def _remove_word(self, word):
+        del self.documents[word]
+        for trigram in self.trigrams.pop(word, ()):
+            words = self.postings.get(trigram)
+            if words is not None:
+                words.discard(word)
+                if not words:
+                    del self.postings[trigram]
+
+    def _add_row(self, row):
+        pk, *texts = row
+        for text in texts:
+            for word in tokenize(text or ""):
+                self.add_word(word, pk)
+
+    def _rows(self, products):
+        return list(products.values_list("pk", *self.fields))
+
+    def ensure_ready(self):
+        if not self.ready:
+            sync_state = self.sync.start()
+            product_model = apps.get_model("catalog", "Product")
+            self.build(self._rows(product_model.objects.all()), sync_state)
+        elif not self.sync.is_current():
+            sync_state = self.sync.start()
+            with self.lock:
+                indexed_pks = list(self.words)
+            self.update_products(self.sync.changed_pks(indexed_pks))
+            self.sync.finish(sync_state)
+
+    def update_products(self, pks):
+        if not self.ready:
+            return
+
+        product_model = apps.get_model("catalog", "Product")
+        with self.lock:
+            rows = self._rows(product_model.objects.filter(pk__in=pks))
+            for pk in pks:
+                self.remove_product(pk)
+            for row in rows:
+                self._add_row(row)
+
+    def update_country(self, country_pk):
+        if not self.ready:
+            return
+
+        product_model = apps.get_model("catalog", "Product")
+        self.update_products(list(product_model.objects.filter(
+            country_id=country_pk
+            ).values_list("pk", flat=True)))
+
+    def similar_words(self, word):
+        query_trigrams = word_trigrams(word)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for candidate in self.postings.get(trigram, ()):
+                shared[candidate] += 1
+
+        similar = {}
+        for candidate, count in shared.items():
+            union = len(query_trigrams) + len(self.trigrams[candidate]) - count
+            similarity = count / union
+            if similarity >= self.threshold:
+                similar[candidate] = similarity
+        return similar
+
+    def search(self, query, limit=None):
+        self.ensure_ready()
+        return self.rank(query, limit)
+
+    def rank(self, query, limit=None):
+        words = tokenize(query)
+        scores = defaultdict(float)
+
+        with self.lock:
+            for word in words:
+                best_scores = {}
+                for candidate, similarity in self.similar_words(word).items():
+                    for pk in self.documents[candidate]:
+                        if similarity > best_scores.get(pk, 0):
+                            best_scores[pk] = similarity
+                for pk, similarity in best_scores.items():
+                    scores[pk] += similarity / len(words)
+
+        ranked = sorted(scores, key=lambda pk: (-scores[pk], -pk))
+        return ranked[:limit]
+
+
+trigram_index = TrigramIndex()
@@ -0,0 +1,122 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from catalog.generation import WISHLIST, bump_generation
+from catalog.models import (
+    Accessory,
+    Clothing,
+    Country,
+    Customer,
+    Footwear,
+    Product,
+    ProductImage,
+    WishlistItem,
+    update_main_images,
+)
+from catalog.search import get_search_backend
+from catalog.search.index import product_index
+from catalog.search.suggest import suggestion_index
+from catalog.wishlist import invalidate_wishlists
+
+PRODUCT_MODELS = (Product, Clothing, Footwear, Accessory)
+
+
+def update_product_index(sender, instance, **kwargs):
+    product_index.update_products([instance.pk])
+    suggestion_index.invalidate()
+
+
+def remove_from_product_index(sender, instance, **kwargs):
+    product_index.remove_product(instance.pk)
+    suggestion_index.invalidate()
+
+
+for model in PRODUCT_MODELS:
+    post_save.connect(update_product_index, sender=model)
+    post_delete.connect(remove_from_product_index, sender=model)
+
+
+@receiver([post_save, post_delete], sender=Country)
+def update_country_index(sender, instance, **kwargs):
+    product_index.update_country(instance.pk)
+    suggestion_index.invalidate()
+
+
+def bump_catalog_generation(sender, **kwargs):
+    bump_generation()
+
+
+for model in PRODUCT_MODELS + (Country, ProductImage):
+    post_save.connect(bump_catalog_generation, sender=model)
+    post_delete.connect(bump_catalog_generation, sender=model)
+
+
+@receiver(post_delete, sender=ProductImage)
+def update_product_main_image(sender, instance, **kwargs):
+    update_main_images(Product.objects.filter(pk=instance.product_id))
+
+
+@receiver(m2m_changed, sender=Customer.wishlist.through)
+def bump_wishlist_generation(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_generation(WISHLIST)
+
+
+@receiver(m2m_changed, sender=Customer.wishlist.through)
+def invalidate_customer_wishlists(sender, instance, action, reverse, pk_set,
+                                  **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            invalidate_wishlists([instance.pk])
+    elif action == "pre_clear":
+        instance._wishlist_customer_pks = list(sender.objects.filter(
+            product=instance
+            ).values_list("customer_id", flat=True))
+    elif action == "post_clear":
+        invalidate_wishlists(instance._wishlist_customer_pks)
+    elif action.startswith("post_"):
+        invalidate_wishlists(pk_set)
+
+
+def change_wishlist_counts(product_pks, delta):
+    # The base manager keeps these updates from bumping the catalog generation.
+    # Greatest() keeps a drifted count from going below zero on removal.
+    Product._base_manager.filter(pk__in=product_pks).update(
+        wishlist_count=Greatest(F("wishlist_count") + delta, 0)
+    )
+
+
+@receiver(m2m_changed, sender=Customer.wishlist.through)
+def count_added_wishlist_items(sender, instance, action, reverse, pk_set, **kwargs):
+    """add() only inserts and reports the missing rows, so pk_set is exact.
+
+    Removals, clear() and cascades delete WishlistItem rows one by one with
+    post_delete, so they are counted there.
+    """
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        change_wishlist_counts([instance.pk], len(pk_set))
+    else:
+        change_wishlist_counts(pk_set, 1)
+
+
+@receiver(post_delete, sender=WishlistItem)
+def count_removed_wishlist_item(sender, instance, **kwargs):
+    change_wishlist_counts([instance.product_id], -1)
+
+
+@receiver(pre_delete, sender=Country)
+def clear_country_search_keys(sender, instance, **kwargs):
+    instance._search_product_pks = instance.update_product_search_keys(
+        deleting=True
+    )
+
+
+@receiver(post_delete, sender=Country)
+def resync_country_products(sender, instance, **kwargs):
+    get_search_backend().update_products(
+        getattr(instance, "_search_product_pks", [])
+    )
@@ -17,17 +17,55 @@ def query_transform(request, **kwargs):
     return updated.urlencode()
 
 
+class WishlistUrls:
+    """Wishlist URLs for one request.
+
+    The URL patterns are reversed and the next path is encoded once, so
+    every product card only pastes its product number in.
+    """
+
+    placeholder = "0000000000"
+
+    def __init__(self, next_path):
+        self.next_path = next_path
+        self.update_parts = self.split("catalog:update-wishlist")
+        self.toggle_parts = self.split("catalog:wishlist-toggle")
+        self.queries = {}
+
+    def split(self, name):
+        url = reverse(name, kwargs={"product_number": self.placeholder})
+        return url.split(self.placeholder)
+
+    def get_query(self, action):
+        if action not in self.queries:
+            query_params = {"next": self.next_path}
+            if action:
+                query_params["action"] = action
+            self.queries[action] = urlencode(query_params)
+        return self.queries[action]
+
+    def update_url(self, product_number, action=None):
+        prefix, suffix = self.update_parts
+        return f"{prefix}{product_number}{suffix}?{self.get_query(action)}"
+
+    def toggle_url(self, product_number):
+        prefix, suffix = self.toggle_parts
+        return f"{prefix}{product_number}{suffix}"
+
+
+def get_wishlist_urls(request):
+    if not hasattr(request, "_wishlist_urls"):
+        request._wishlist_urls = WishlistUrls(request.get_full_path())
+    return request._wishlist_urls
+
+
 @register.simple_tag(takes_context=True)
 def update_wishlist_url(context, product, action=None):
-    product_number = product.product_number
-    base_url = reverse(
-        "catalog:update-wishlist", 
-        kwargs={"product_number": product_number}
-        )
-    next_path = context["request"].get_full_path()
-
-    query_params = {"next": next_path}
-    if action:
-        query_params["action"] = action
-
-    return f"{base_url}?{urlencode(query_params)}"
+    return get_wishlist_urls(context["request"]).update_url(
+        product.product_number, action
+    )
+
+
+@register.simple_tag(takes_context=True)
+def wishlist_toggle_url(context, product):
+    return get_wishlist_urls(context["request"]).toggle_url(product.product_number)
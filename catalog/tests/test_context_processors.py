@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.collation import sort_key
+from catalog.models import Clothing, Country
+
+
+class CountriesContextTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for ua_name, en_name in (("Франція", "France"), ("Єгипет", "Egypt"),
+                                 ("Естонія", "Estonia")):
+            country = Country.objects.create(ua_name=ua_name, en_name=en_name)
+            Clothing.objects.create(
+                name="Бушлат", country=country, price_low=1, price_high=2,
+            )
+
+    def get_country_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        return [query for query in queries if "product_count" in query["sql"]]
+
+    def test_countries_are_sorted_by_ukrainian_collation(self):
+        response = self.client.get(reverse("catalog:product-list"))
+        self.assertEqual(
+            [c["ua_name"] for c in response.context["countries_with_products"]],
+            ["Естонія", "Єгипет", "Франція"],
+        )
+
+    def test_unpublished_products_are_not_counted(self):
+        country = Country.objects.get(en_name="France")
+        Clothing.objects.create(
+            name="Кітель", country=country, price_low=1, price_high=2,
+            is_published=False,
+        )
+        Clothing.objects.filter(country__en_name="Egypt").update(
+            is_published=False
+        )
+        response = self.client.get(reverse("catalog:product-list"))
+        self.assertEqual(
+            [(c["en_name"], c["product_count"])
+             for c in response.context["countries_with_products"]],
+            [("Estonia", 1), ("France", 1)],
+        )
+
+    def test_countries_are_not_loaded_when_unused(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+        )
+        self.client.force_login(admin)
+        self.assertEqual(
+            self.get_country_queries(reverse("admin:catalog_country_changelist")),
+            [],
+        )
+        self.assertEqual(len(self.get_country_queries(reverse("about-us"))), 1)
+
+    def test_countries_are_sorted_without_collator(self):
+        Country.objects.create(ua_name="Бельгія", en_name="Belgium")
+        with mock.patch("catalog.collation.get_collator") as get_collator:
+            response = self.client.get(reverse("catalog:country-list"))
+        get_collator.assert_not_called()
+        self.assertEqual(
+            [country.ua_name for country in response.context["country_list"]],
+            ["Бельгія", "Естонія", "Єгипет", "Франція"],
+        )
+
+    def test_sort_key_follows_renames(self):
+        country = Country.objects.get(en_name="France")
+        country.ua_name = "Алжир"
+        country.save()
+        self.assertEqual(country.ua_sort_key, sort_key("Алжир"))
+        self.assertEqual(Country.objects.first(), country)
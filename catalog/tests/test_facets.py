@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Accessory, Clothing, Country, Footwear
+
+
+class FacetViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.germany = Country.objects.create(ua_name="Німеччина", en_name="Germany")
+        self.france = Country.objects.create(ua_name="Франція", en_name="France")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат", country=self.germany, price_low=1500, price_high=2000,
+        )
+        self.shirt = Clothing.objects.create(
+            name="Сорочка", country=self.france, price_low=300, price_high=400,
+            available=False,
+        )
+        self.boots = Footwear.objects.create(
+            name="Черевики", country=self.germany, price_low=3000, price_high=3500,
+        )
+        self.url = reverse("catalog:product-list")
+
+    def get_facet(self, response, name):
+        for facet in response.context["facets"]:
+            if facet["name"] == name:
+                return {option["label"]: option for option in facet["options"]}
+        return {}
+
+    def get_pks(self, response):
+        return [product.pk for product in response.context["product_list"]]
+
+    def test_facets_filter_products(self):
+        response = self.client.get(self.url, {"country": self.germany.pk})
+        self.assertEqual(self.get_pks(response), [self.boots.pk, self.jacket.pk])
+
+        response = self.client.get(
+            self.url, {"country": self.germany.pk, "category": "1"}
+        )
+        self.assertEqual(self.get_pks(response), [self.jacket.pk])
+
+        response = self.client.get(self.url, {"available": "1", "price": "0-500"})
+        self.assertEqual(self.get_pks(response), [])
+
+        response = self.client.get(self.url, {"price": "2000-5000"})
+        self.assertEqual(self.get_pks(response), [self.boots.pk])
+
+    def test_facet_counts_ignore_own_selection(self):
+        response = self.client.get(self.url, {"country": self.germany.pk})
+        countries = self.get_facet(response, "country")
+        self.assertEqual(countries["Німеччина"]["count"], 2)
+        self.assertTrue(countries["Німеччина"]["selected"])
+        self.assertEqual(countries["Франція"]["count"], 1)
+
+        categories = self.get_facet(response, "category")
+        self.assertEqual(categories["Одяг"]["count"], 1)
+        self.assertEqual(categories["Взуття"]["count"], 1)
+        self.assertNotIn("Аксесуари", categories)
+
+    def test_facets_are_combined_with_search(self):
+        response = self.client.get(
+            self.url, {"search_input": "бушлат", "search_scope": "global"}
+        )
+        countries = self.get_facet(response, "country")
+        self.assertEqual(countries["Німеччина"]["count"], 1)
+        self.assertNotIn("Франція", countries)
+
+    def test_scope_facet_is_hidden(self):
+        response = self.client.get(reverse("catalog:clothing-list"))
+        self.assertEqual(self.get_facet(response, "category"), {})
+
+        response = self.client.get(
+            reverse("catalog:country-products-list", args=["Germany"])
+        )
+        self.assertEqual(self.get_facet(response, "country"), {})
+        self.assertEqual(len(response.context["product_list"]), 2)
+
+    def test_unknown_country_page_is_not_found(self):
+        response = self.client.get(
+            reverse("catalog:country-products-list", args=["Unknown"])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_facet_counts_are_computed_in_one_cached_query(self):
+        for _ in range(5):
+            Accessory.objects.create(name="Ремінь", price_low=10, price_high=20)
+        params = {"country": self.germany.pk, "price": "1000-2000"}
+
+        def count_facet_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(self.url, params)
+            return sum('"facet_0_0"' in query["sql"] for query in queries)
+
+        self.assertEqual(count_facet_queries(), 1)
+        self.assertEqual(count_facet_queries(), 0)
+
+    def test_facet_counts_follow_catalog_changes(self):
+        self.client.get(self.url)
+        Footwear.objects.create(
+            name="Берці", country=self.france, price_low=100, price_high=200,
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(self.get_facet(response, "country")["Франція"]["count"], 2)
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.generation import WISHLIST, bump_generation, get_generation
+from catalog.models import Clothing, Country, Product, ProductImage
+
+
+class CatalogGenerationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        self.product = Clothing.objects.create(
+            name="Бушлат", country=self.country, price_low=1, price_high=2,
+        )
+
+    def assertBumps(self, func, scope="catalog"):
+        generation = get_generation(scope)
+        func()
+        self.assertGreater(get_generation(scope), generation)
+
+    def test_model_signals_bump_generation(self):
+        self.assertBumps(lambda: Clothing.objects.create(
+            name="Кітель", price_low=1, price_high=2,
+        ))
+        self.assertBumps(lambda: self.country.save())
+        self.assertBumps(lambda: self.product.delete())
+
+    def test_bulk_writes_bump_generation(self):
+        self.assertBumps(lambda: Product.objects.update(available=False))
+        self.assertBumps(lambda: Country.objects.filter(pk=self.country.pk).update(
+            ua_name="Бельгія"
+        ))
+        self.assertBumps(lambda: ProductImage.objects.update(is_main=False))
+
+    def test_wishlist_changes_bump_wishlist_generation(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        catalog_generation = get_generation()
+        self.assertBumps(lambda: user.wishlist.add(self.product), WISHLIST)
+        self.assertBumps(lambda: user.wishlist.clear(), WISHLIST)
+        self.assertEqual(get_generation(), catalog_generation)
+
+    def test_generation_is_bumped_again_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            generation = bump_generation()
+        self.assertGreater(get_generation(), generation)
+
+    def test_sidebar_shows_new_country_immediately(self):
+        url = reverse("catalog:product-list")
+        response = self.client.get(url)
+        self.assertEqual(len(response.context["countries_with_products"]), 1)
+
+        country = Country.objects.create(ua_name="Бельгія", en_name="Belgium")
+        Clothing.objects.create(
+            name="Кітель", country=country, price_low=1, price_high=2,
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            [c["ua_name"] for c in response.context["countries_with_products"]],
+            ["Бельгія", "Франція"],
+        )
+
+    def test_admin_bulk_action_invalidates_cached_pages(self):
+        url = reverse("catalog:product-list")
+        self.client.get(url)
+
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+        )
+        self.client.force_login(admin)
+        self.client.post(reverse("admin:catalog_product_changelist"), {
+            "action": "make_unavailable",
+            "_selected_action": [self.product.pk],
+        })
+        self.client.logout()
+
+        response = self.client.get(url)
+        self.assertFalse(response.context["object_list"][0].available)
+
+    def test_bump_command(self):
+        self.assertBumps(lambda: call_command("bump_cache_generation", stdout=StringIO()))
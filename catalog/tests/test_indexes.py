@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+from unittest import mock, skipIf
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import RequestFactory, TestCase
+
+from catalog.models import Clothing, Country
+from catalog.operations import OptionalExtension, VendorRunSQL
+from catalog.views import ClothingListView, CountryProductsListView, ProductListView
+
+
+class ProductListIndexTest(TestCase):
+    """Fails when a list queryset stops using the index written for it."""
+
+    def setUp(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        for number in range(30):
+            Clothing.objects.create(
+                name=f"Куртка {number}",
+                country=self.country,
+                price_low=1,
+                price_high=2,
+            )
+
+    def explain(self, view_class, **kwargs):
+        view = view_class()
+        view.request = RequestFactory().get("/")
+        view.request.session = {}
+        view.kwargs = kwargs
+        return view.get_queryset()[:ProductListView.paginate_by].explain()
+
+    def test_product_list_uses_ordering_index(self):
+        plan = self.explain(ProductListView)
+        self.assertRegex(plan, "product_(available_id|visible_avail)_idx")
+
+    def test_category_list_uses_category_index(self):
+        self.assertIn("product_category_avail_idx", self.explain(ClothingListView))
+
+    def test_country_list_uses_country_index(self):
+        plan = self.explain(CountryProductsListView, name=self.country.en_name)
+        self.assertIn("product_country_avail_idx", plan)
+
+
+class TrigramMigrationTest(TestCase):
+    def test_trigram_indexes_require_extension(self):
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        for (app_label, name), migration in loader.disk_migrations.items():
+            for operation in migration.operations:
+                if "gin_trgm_ops" in str(getattr(operation, "sql", "")):
+                    with self.subTest(migration=name):
+                        self.assertEqual(operation.extension, "pg_trgm")
+
+    @skipIf(connection.vendor == "postgresql", "checks other database vendors")
+    def test_trigram_operations_are_skipped(self):
+        schema_editor = SimpleNamespace(connection=connection, execute=mock.Mock())
+        operations = [
+            OptionalExtension("pg_trgm"),
+            VendorRunSQL("postgresql", "SELECT 1", "SELECT 1", extension="pg_trgm"),
+        ]
+        for operation in operations:
+            operation.database_forwards("catalog", schema_editor, None, None)
+            operation.database_backwards("catalog", schema_editor, None, None)
+        schema_editor.execute.assert_not_called()
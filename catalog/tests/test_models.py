@@ -1,7 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from slugify import slugify
 
 from catalog.models import (
@@ -11,6 +12,7 @@ from catalog.models import (
     Footwear, 
     Accessory, 
     ProductImage, 
+    ProductNumberSequence,
     Customer
 )
 
@@ -249,16 +251,56 @@ class ProductModelTest(TestCase):
         product_numbers = list(c.product_number for c in Clothing.objects.all())
         self.assertEqual(len(product_numbers), len(set(product_numbers)))
 
+    def test_product_numbers_are_reserved_in_blocks(self):
+        block = ProductNumberSequence.reserve("1", 100)
+        self.assertEqual(block, range(10002, 10102))
+        product = Clothing.objects.create(name="а", price_low=1, price_high=10)
+        self.assertEqual(product.product_number, 10102)
+
+    def test_product_number_allocation_does_not_sort_products(self):
+        with CaptureQueriesContext(connection) as queries:
+            Clothing.objects.create(name="а", price_low=1, price_high=10)
+        self.assertFalse(any(
+            "ORDER BY" in query["sql"] and "product_number" in query["sql"]
+            for query in queries
+        ))
+
+    def test_missing_sequence_starts_after_existing_numbers(self):
+        ProductNumberSequence.objects.all().delete()
+        product = Footwear.objects.create(name="а", price_low=1, price_high=10)
+        self.assertEqual(product.product_number, 20002)
+        self.assertEqual(ProductNumberSequence.reserve("3"), range(30002, 30003))
+
     def test_product_number_cannot_be_set_manually(self):
         for model in self.product_child_models:
-            with self.assertRaises(Product.DoesNotExist):
+            with self.assertRaises(ValidationError):
                 model.objects.create(
                     name="тест", 
                     price_low="1", 
                     price_high="2", 
                     product_number="33333"
                     )
-                
+
+    def test_reserved_number_must_match_category(self):
+        ProductNumberSequence.reserve("3")
+        with self.assertRaises(ValidationError):
+            Clothing.objects.create(
+                name="тест", price_low=1, price_high=2, product_number=30002
+            )
+        product = Accessory.objects.create(name="тест", price_low=1, price_high=2)
+        self.assertEqual(product.product_number, 30003)
+
+    def test_products_are_created_from_reserved_block(self):
+        block = ProductNumberSequence.reserve("1", 3)
+        for product_number in block:
+            product = Clothing.objects.create(
+                name="тест", price_low=1, price_high=2, product_number=product_number
+            )
+            self.assertEqual(product.product_number, product_number)
+            self.assertEqual(product.slug, f"{product_number}-test")
+        product = Clothing.objects.create(name="тест", price_low=1, price_high=2)
+        self.assertEqual(product.product_number, block[-1] + 1)
+
     def test_product_number_cannot_be_changed(self):
         for product in self.products:
             product.product_number = "33333"
@@ -329,6 +371,18 @@ class ProductModelTest(TestCase):
     def test_product_category_is_assigned_correctly(self):
         pass
 
+    def test_category_models_share_product_table(self):
+        for model in self.product_child_models:
+            self.assertTrue(model._meta.proxy)
+            self.assertNotIn("JOIN", str(model.objects.all().query))
+            self.assertTrue(all(
+                product.category == model.CATEGORY for product in model.objects.all()
+                ))
+        self.assertEqual(
+            Product.objects.count(),
+            sum(model.objects.count() for model in self.product_child_models),
+        )
+
 
 class ProductImageModelTest(TestCase):
     def setUp(self):
@@ -388,6 +442,36 @@ class ProductImageModelTest(TestCase):
     def test_product_image_str(self):
         self.assertEqual(str(self.product_image), f"Зображення: {self.product}")
 
+    def test_product_main_image_is_stored(self):
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.main_image, self.product_image)
+
+        main_image = ProductImage.objects.create(
+            product=self.product, 
+            image="catalog\tests\test_media\test_3.jpg",
+            is_main=True
+            )
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.main_image, main_image)
+
+        main_image.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.main_image, self.product_image)
+
+        self.product_image.delete()
+        self.product.refresh_from_db()
+        self.assertIsNone(self.product.main_image)
+
+    def test_product_can_have_only_one_main_image(self):
+        self.product_image.is_main = True
+        self.product_image.save()
+        with self.assertRaises(IntegrityError):
+            ProductImage.objects.bulk_create([ProductImage(
+                product=self.product, 
+                image="catalog\tests\test_media\test_3.jpg",
+                is_main=True,
+                )])
+
 
 class CustomerModelTest(TestCase):
     def setUp(self):
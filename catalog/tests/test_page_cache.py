@@ -0,0 +1,166 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Clothing, Country, ProductImage
+
+
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        self.product = Clothing.objects.create(
+            name="Бушлат", country=self.country, price_low=1, price_high=2,
+        )
+        self.urls = [
+            reverse("catalog:product-list"),
+            reverse("catalog:clothing-list"),
+            reverse("catalog:footwear-list"),
+            reverse("catalog:accessory-list"),
+            reverse("catalog:country-products-list", args=["France"]),
+            self.product.get_absolute_url(),
+        ]
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, sum("catalog_" in query["sql"] for query in queries)
+
+    def test_anonymous_pages_are_cached(self):
+        for url in self.urls:
+            first, _ = self.get(url)
+            second, queries = self.get(url)
+            self.assertEqual(second.status_code, 200)
+            self.assertEqual(queries, 0)
+            self.assertEqual(first.content, second.content)
+
+    def test_cache_key_normalizes_query_string(self):
+        url = reverse("catalog:product-list")
+        self.get(url, {"search_input": "БУШЛАТ ", "search_scope": "global"})
+        _, queries = self.get(url, {"search_scope": "global", "search_input": "бушлат"})
+        self.assertEqual(queries, 0)
+
+        response, queries = self.get(url, {"search_input": "кітель"})
+        self.assertGreater(queries, 0)
+        self.assertNotContains(response, "Бушлат</h6>")
+
+    def test_catalog_writes_invalidate_pages(self):
+        url = reverse("catalog:product-list")
+        self.get(url)
+
+        self.product.name = "Кітель"
+        self.product.save()
+        response, _ = self.get(url)
+        self.assertContains(response, "Кітель")
+
+        self.country.ua_name = "Бельгія"
+        self.country.save()
+        response, _ = self.get(url)
+        self.assertContains(response, "Бельгія")
+
+        ProductImage.objects.create(
+            product=self.product, image="catalog\\tests\\test_media\\test_1.jpg"
+        )
+        response, _ = self.get(url)
+        self.assertContains(response, "test_1.jpg")
+
+    def test_authenticated_users_are_not_served_cached_pages(self):
+        url = reverse("catalog:product-list")
+        self.get(url)
+
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        user.wishlist.add(self.product)
+        self.client.force_login(user)
+        response, queries = self.get(url)
+        self.assertGreater(queries, 0)
+        self.assertEqual(
+            list(response.context["customer_wishlist"]),
+            [self.product.product_number],
+        )
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        self.product = Clothing.objects.create(
+            name="Бушлат", country=self.country, price_low=1, price_high=2,
+        )
+        self.image = ProductImage.objects.create(
+            product=self.product, image="catalog\\tests\\test_media\\test_1.jpg"
+        )
+        self.list_url = reverse("catalog:product-list")
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        return response, sum("catalog_" in query["sql"] for query in queries)
+
+    def test_unchanged_list_page_is_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response, queries = self.get(self.list_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(queries, 0)
+
+        self.product.save()
+        response, _ = self.get(self.list_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_user_wishlist(self):
+        anonymous_etag = self.client.get(self.list_url)["ETag"]
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        self.client.force_login(user)
+        etag = self.client.get(self.list_url)["ETag"]
+        self.assertNotEqual(etag, anonymous_etag)
+
+        user.wishlist.add(self.product)
+        response, _ = self.get(self.list_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_changes_after_login(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        self.client.login(email="user@test.com", password="password")
+        etag = self.client.get(self.list_url)["ETag"]
+
+        self.client.post(reverse("logout"))
+        self.client.login(email="user@test.com", password="password")
+        response, _ = self.get(self.list_url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+    def test_detail_page_uses_last_modified(self):
+        url = self.product.get_absolute_url()
+        last_modified = self.client.get(url)["Last-Modified"]
+        response, _ = self.get(url, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        later = timezone.now() + timedelta(seconds=5)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            self.image.save()
+        response, _ = self.get(url, if_modified_since=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_image_page_is_not_modified(self):
+        url = reverse("catalog:product-image-detail", args=[self.image.pk])
+        etag = self.client.get(url)["ETag"]
+        response, _ = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_bulk_update_stamps_updated_at(self):
+        updated_at = self.product.updated_at
+        Clothing.objects.update(available=False)
+        self.product.refresh_from_db()
+        self.assertGreater(self.product.updated_at, updated_at)
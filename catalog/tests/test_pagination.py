@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Clothing, Footwear, Product
+from catalog.pagination import (
+    CachedCountPaginator,
+    KeysetPaginator,
+    WishlistKeysetPaginator,
+    parse_cursor,
+)
+from catalog.views import ProductListView
+
+
+@override_settings(CATALOG_PAGINATION_MODE="keyset")
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        self.per_page = ProductListView.paginate_by
+        for number in range(self.per_page * 2 + 3):
+            Clothing.objects.create(
+                name=f"Куртка {number}",
+                price_low=1,
+                price_high=2,
+                available=number % 3 != 0,
+            )
+        Footwear.objects.create(name="Черевики", price_low=1, price_high=2)
+        self.url = reverse("catalog:clothing-list")
+
+    def get_pks(self, response):
+        return [product.pk for product in response.context["object_list"]]
+
+    def walk(self, url, params=None):
+        pages = []
+        response = self.client.get(url, params)
+        pages.append(self.get_pks(response))
+        while response.context["page_obj"].has_next():
+            cursor = response.context["page_obj"].next_page_number()
+            response = self.client.get(url, {**(params or {}), "page": cursor})
+            pages.append(self.get_pks(response))
+        return pages, response
+
+    def test_pages_follow_default_ordering(self):
+        pages, _ = self.walk(self.url)
+        expected = list(Clothing.objects.values_list("pk", flat=True))
+        self.assertEqual([pk for page in pages for pk in page], expected)
+        self.assertEqual([len(page) for page in pages], [12, 12, 3])
+
+    def test_previous_cursor_returns_previous_page(self):
+        pages, response = self.walk(self.url)
+        page_obj = response.context["page_obj"]
+        while page_obj.has_previous():
+            response = self.client.get(
+                self.url, {"page": page_obj.previous_page_number()}
+            )
+            page_obj = response.context["page_obj"]
+            pages.pop()
+            self.assertEqual(self.get_pks(response), pages[-1])
+        self.assertEqual(len(pages), 1)
+
+    def test_keyset_pages_do_not_count_rows(self):
+        response = self.client.get(self.url)
+        cursor = response.context["page_obj"].next_page_number()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"page": cursor})
+        self.assertTrue(response.context["is_paginated"])
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+        self.assertNotIn("OFFSET", queries.captured_queries[-1]["sql"])
+
+    def test_numeric_pages_use_regular_paginator(self):
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(response.context["page_obj"].number, 2)
+        self.assertEqual(response.context["paginator"].num_pages, 3)
+
+    def test_other_orderings_use_regular_paginator(self):
+        queryset = Product.objects.order_by("-price_low")
+        self.assertFalse(KeysetPaginator.supports(queryset))
+        self.assertTrue(KeysetPaginator.supports(Clothing.objects.all()))
+        self.assertEqual(parse_cursor("n1-15"), ("n", True, 15))
+        self.assertIsNone(parse_cursor("3"))
+
+    def test_wishlist_uses_keyset_pagination(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        pks = list(Clothing.objects.values_list("pk", flat=True))
+        added_at = timezone.now()
+        for number, pk in enumerate(pks):
+            # Pairs of items share added_at, so the item id breaks the tie
+            moment = added_at + timedelta(seconds=number // 2)
+            with mock.patch("django.utils.timezone.now", return_value=moment):
+                user.wishlist.add(pk)
+        self.client.force_login(user)
+        url = reverse("catalog:customer-wishlist")
+
+        pages, response = self.walk(url)
+        self.assertEqual([pk for page in pages for pk in page], pks[::-1])
+        self.assertEqual([len(page) for page in pages], [12, 12, 3])
+
+        cursor = response.context["page_obj"].previous_page_number()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"page": cursor})
+        self.assertEqual(self.get_pks(response), pages[1])
+        self.assertFalse(any("COUNT(" in query["sql"] for query in queries))
+        self.assertNotIn("OFFSET", queries.captured_queries[-1]["sql"])
+
+    def test_wishlist_cursor_must_be_valid(self):
+        paginator = WishlistKeysetPaginator
+        self.assertIsNone(paginator.parse_cursor("n1-15x"))
+        self.assertIsNone(paginator.parse_cursor("n" + "9" * 30 + "-1"))
+        self.assertEqual(
+            paginator.parse_cursor("p1000000-7"),
+            ("p", datetime(1970, 1, 1, 0, 0, 1, tzinfo=dt_timezone.utc), 7),
+        )
+
+
+class CachedCountPaginatorTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for number in range(15):
+            Clothing.objects.create(name=f"Куртка {number}", price_low=1, price_high=2)
+        self.url = reverse("catalog:clothing-list")
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, [
+            query["sql"] for query in queries if "__count" in query["sql"]
+        ]
+
+    def test_count_is_cached(self):
+        response, counts = self.count_queries(self.url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(response.context["paginator"].count, 15)
+
+        response, counts = self.count_queries(self.url, {"page": 2})
+        self.assertEqual(counts, [])
+        self.assertEqual(response.context["paginator"].num_pages, 2)
+
+    def test_count_cache_is_per_queryset(self):
+        self.count_queries(self.url)
+        _, counts = self.count_queries(self.url, {"search_input": "куртка 1"})
+        self.assertEqual(len(counts), 1)
+
+    def test_count_is_invalidated_by_catalog_writes(self):
+        self.count_queries(self.url)
+        Clothing.objects.create(name="Кітель", price_low=1, price_high=2)
+        response, counts = self.count_queries(self.url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(response.context["paginator"].count, 16)
+
+    def test_estimate_is_only_used_on_postgresql(self):
+        paginator = CachedCountPaginator(Product.objects.all(), 10)
+        self.assertIsNone(paginator.get_estimated_count(Product.objects.all()))
+        self.assertEqual(paginator.count, 15)
+
+    def test_wishlist_count_is_cached_until_wishlist_changes(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        user.wishlist.set(Clothing.objects.all())
+        self.client.force_login(user)
+        url = reverse("catalog:customer-wishlist")
+        self.count_queries(url)
+
+        _, counts = self.count_queries(url, {"page": 2})
+        self.assertEqual(counts, [])
+
+        user.wishlist.remove(Clothing.objects.first())
+        response, counts = self.count_queries(url)
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(response.context["paginator"].count, 14)
+
+    def test_admin_changelist_count_is_cached(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+        )
+        self.client.force_login(admin)
+        url = reverse("admin:catalog_productwishliststats_changelist")
+        self.count_queries(url, {"wishitems": "yes"})
+
+        _, counts = self.count_queries(url, {"wishitems": "yes"})
+        self.assertEqual(counts, [])
+
+        admin.wishlist.add(Product.objects.first())
+        response, counts = self.count_queries(url, {"wishitems": "yes"})
+        self.assertEqual(response.context["cl"].result_count, 1)
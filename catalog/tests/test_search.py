@@ -0,0 +1,446 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Clothing, Country, Footwear, Product
+from catalog.search import search_products
+from catalog.search.index import product_index
+from catalog.search.normalize import make_search_key, normalize
+from catalog.search.numbers import product_number_q
+from catalog.search.suggest import suggestion_index
+from catalog.search.trigram import trigram_index
+from catalog.views import ProductListView
+
+
+class SearchBackendTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат зимовий",
+            country=self.country,
+            description="теплий",
+            price_low=100,
+            price_high=200,
+        )
+        self.boots = Footwear.objects.create(
+            name="Черевики",
+            description="підходять під бушлат",
+            price_low=100,
+            price_high=200,
+        )
+
+    def search(self, query, queryset=None):
+        if queryset is None:
+            queryset = Product.objects.all()
+        return [product.pk for product in search_products(queryset, query)]
+
+    def test_search_matches_word_prefix(self):
+        self.assertEqual(self.search("бушл"), [self.jacket.pk, self.boots.pk])
+        self.assertEqual(self.search("ЧЕРЕВ"), [self.boots.pk])
+
+    def test_search_ranks_name_above_description(self):
+        results = self.search("бушлат")
+        self.assertEqual(results[0], self.jacket.pk)
+
+    def test_search_matches_country_names(self):
+        self.assertEqual(self.search("франц"), [self.jacket.pk])
+        self.assertEqual(self.search("france"), [self.jacket.pk])
+
+    def test_search_matches_product_number(self):
+        self.assertEqual(self.search(str(self.boots.product_number)), [self.boots.pk])
+
+    def test_search_index_follows_product_changes(self):
+        self.jacket.name = "Кітель"
+        self.jacket.save()
+        self.assertEqual(self.search("кітель"), [self.jacket.pk])
+        self.assertEqual(self.search("бушлат"), [self.boots.pk])
+
+    def test_search_index_follows_country_changes(self):
+        self.country.ua_name = "Бельгія"
+        self.country.en_name = "Belgium"
+        self.country.save()
+        self.assertEqual(self.search("бельг"), [self.jacket.pk])
+        self.assertEqual(self.search("франц"), [])
+
+    def test_search_index_follows_country_deletion(self):
+        self.country.delete()
+        self.assertEqual(self.search("france"), [])
+        self.assertEqual(self.search("бушлат"), [self.jacket.pk, self.boots.pk])
+
+    def test_search_respects_base_queryset(self):
+        self.assertEqual(self.search("бушлат", Footwear.objects.all()), [self.boots.pk])
+
+    def test_search_without_words_returns_nothing(self):
+        self.assertEqual(self.search("!?"), [])
+
+
+class SearchScopeViewTest(TestCase):
+    def setUp(self):
+        Clothing.objects.create(name="Бушлат", price_low=1, price_high=2)
+        Footwear.objects.create(name="Черевики", price_low=1, price_high=2)
+        self.url = reverse("catalog:footwear-list")
+
+    def test_category_scope_searches_current_category(self):
+        response = self.client.get(self.url + "?search_input=бушлат")
+        self.assertEqual(len(response.context["object_list"]), 0)
+
+    def test_global_scope_searches_whole_catalog(self):
+        response = self.client.get(
+            self.url + "?search_input=бушлат&search_scope=global"
+            )
+        self.assertEqual(len(response.context["object_list"]), 1)
+
+
+class FuzzySearchTest(TestCase):
+    def setUp(self):
+        trigram_index.invalidate()
+        self.addCleanup(trigram_index.invalidate)
+        self.country = Country.objects.create(ua_name="Німеччина", en_name="Germany")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат зимовий",
+            price_low=100,
+            price_high=200,
+        )
+        self.boots = Footwear.objects.create(
+            name="Черевики Meindl",
+            country=self.country,
+            price_low=100,
+            price_high=200,
+        )
+
+    def search(self, query):
+        return [
+            product.pk for product in search_products(Product.objects.all(), query)
+            ]
+
+    def test_normalize_folds_mixed_script_words(self):
+        self.assertEqual(normalize("БушлaT"), "бушлат")
+        self.assertEqual(normalize("Meіndl"), "meindl")
+        self.assertEqual(normalize("Meindl бушлат"), "meindl бушлат")
+
+    def test_search_finds_mixed_script_query(self):
+        self.assertEqual(self.search("бушлaт"), [self.jacket.pk])
+
+    def test_search_finds_misspelled_words(self):
+        self.assertEqual(self.search("бушлад"), [self.jacket.pk])
+        self.assertEqual(self.search("mendl"), [self.boots.pk])
+        self.assertEqual(self.search("німечина"), [self.boots.pk])
+
+    def test_fuzzy_results_are_sorted_by_similarity(self):
+        shirt = Clothing.objects.create(name="Бушлак", price_low=1, price_high=2)
+        self.assertEqual(self.search("бушлад зимови"), [self.jacket.pk, shirt.pk])
+
+    def test_fuzzy_search_ignores_unrelated_words(self):
+        self.assertEqual(self.search("ковдра"), [])
+
+    def test_index_catches_up_with_other_processes(self):
+        self.assertEqual(self.search("бушлад"), [self.jacket.pk])
+        Product.objects.filter(pk=self.jacket.pk).update(name="Кітель")
+        self.assertEqual(trigram_index.search("кітєль"), [self.jacket.pk])
+        self.assertEqual(trigram_index.search("бушлад"), [])
+
+    def test_saves_update_index_in_place(self):
+        self.assertEqual(self.search("бушлад"), [self.jacket.pk])
+        with mock.patch.object(trigram_index, "build") as build:
+            self.jacket.name = "Кітель"
+            self.jacket.save()
+            self.country.ua_name = "Австрія"
+            self.country.save()
+            self.assertEqual(self.search("кітел"), [self.jacket.pk])
+            self.assertEqual(self.search("бушлад"), [])
+            self.assertEqual(self.search("австия"), [self.boots.pk])
+            self.assertEqual(self.search("німечина"), [])
+        build.assert_not_called()
+        self.assertNotIn("бушлат", trigram_index.trigrams)
+
+
+class SearchKeyTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(ua_name="Сполучені Штати", en_name="Usa")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат «Хʼюстон»",
+            country=self.country,
+            price_low=100,
+            price_high=200,
+        )
+        self.boots = Footwear.objects.create(
+            name="Черевики Meindl",
+            price_low=100,
+            price_high=200,
+        )
+
+    def search(self, query):
+        return [
+            product.pk for product in search_products(Product.objects.all(), query)
+            ]
+
+    def test_search_key_contains_both_scripts(self):
+        key = make_search_key("Бушлат Meindl")
+        self.assertIn("бушлат meindl", key)
+        self.assertIn("bushlat meindl", key)
+        self.assertIn("бушлат меіндл", key)
+
+    def test_search_key_is_stored_on_save(self):
+        self.jacket.refresh_from_db()
+        self.assertIn("bushlat", self.jacket.search_key)
+        self.assertIn("сполучені штати", self.jacket.search_key)
+        self.assertIn("сполучені штати", Country.objects.get().search_key)
+
+    def test_search_matches_other_script(self):
+        self.assertEqual(self.search("Bushlat"), [self.jacket.pk])
+        self.assertEqual(self.search("мейндл"), [])
+        self.assertEqual(self.search("меіндл"), [self.boots.pk])
+
+    def test_search_unifies_apostrophes(self):
+        self.assertEqual(self.search("х'юстон"), [self.jacket.pk])
+        self.assertEqual(self.search("Х’ЮСТОН"), [self.jacket.pk])
+
+    def test_country_changes_update_product_keys(self):
+        self.country.ua_name = "Канада"
+        self.country.save()
+        self.jacket.refresh_from_db()
+        self.assertIn("канада", self.jacket.search_key)
+        self.assertNotIn("штати", self.jacket.search_key)
+
+        self.country.delete()
+        self.jacket.refresh_from_db()
+        self.assertNotIn("канада", self.jacket.search_key)
+
+
+@override_settings(CATALOG_SEARCH_BACKEND="memory")
+class InvertedIndexTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(ua_name="Франція", en_name="France")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат зимовий",
+            country=self.country,
+            price_low=100,
+            price_high=200,
+        )
+        self.boots = Footwear.objects.create(
+            name="Черевики",
+            description="до бушлата",
+            price_low=100,
+            price_high=200,
+        )
+        product_index.rebuild()
+        self.addCleanup(product_index.invalidate)
+
+    def test_index_finds_products_by_prefix_and_weight(self):
+        self.assertEqual(
+            product_index.search("бушл"), [self.jacket.pk, self.boots.pk]
+            )
+        self.assertEqual(product_index.search("франц бушл"), [self.jacket.pk])
+        self.assertEqual(
+            product_index.search(str(self.boots.product_number)), [self.boots.pk]
+            )
+
+    def test_index_applies_scope(self):
+        self.assertEqual(
+            product_index.search("бушл", {"category": Footwear.CATEGORY}),
+            [self.boots.pk],
+        )
+        self.assertEqual(
+            product_index.search("бушл", {"country_id": self.country.pk}),
+            [self.jacket.pk],
+        )
+
+    def test_index_is_updated_on_product_changes(self):
+        self.jacket.name = "Кітель"
+        self.jacket.save()
+        self.assertEqual(product_index.search("кіт"), [self.jacket.pk])
+
+        shirt = Clothing.objects.create(name="Сорочка", price_low=1, price_high=2)
+        self.assertEqual(product_index.search("сороч"), [shirt.pk])
+
+        shirt.delete()
+        self.assertEqual(product_index.search("сороч"), [])
+
+    def test_index_is_updated_on_country_changes(self):
+        self.country.ua_name = "Бельгія"
+        self.country.save()
+        self.assertEqual(product_index.search("бельг"), [self.jacket.pk])
+
+        self.country.delete()
+        self.assertEqual(product_index.search("бельг"), [])
+
+    def test_index_catches_up_with_other_processes(self):
+        # Bulk writes send no signals, like writes made by another worker
+        Product.objects.filter(pk=self.jacket.pk).update(name="Кітель")
+        with mock.patch.object(product_index, "remove_product"):
+            self.boots.delete()
+
+        with mock.patch.object(product_index, "rebuild") as rebuild:
+            self.assertEqual(product_index.search("кіт"), [self.jacket.pk])
+            self.assertEqual(product_index.search("черев"), [])
+        rebuild.assert_not_called()
+        self.assertEqual(product_index.stats()["documents"], 1)
+
+    def test_index_hides_unpublished_products(self):
+        Clothing.objects.create(
+            name="бушлат", price_low=1, price_high=2, is_published=False
+            )
+        self.assertEqual(
+            product_index.search("бушлат"), [self.jacket.pk, self.boots.pk]
+            )
+
+    def test_index_reports_its_cost(self):
+        stats = product_index.stats()
+        self.assertEqual(stats["documents"], 2)
+        self.assertGreater(stats["memory_bytes"], 0)
+        self.assertIsNotNone(stats["rebuild_seconds"])
+
+    def test_list_view_fetches_only_current_page(self):
+        for _ in range(ProductListView.paginate_by):
+            Clothing.objects.create(name="Бушлат", price_low=1, price_high=2)
+
+        url = reverse("catalog:clothing-list") + "?search_input=бушлат"
+        response = self.client.get(url)
+        self.assertTrue(response.context["is_paginated"])
+        self.assertEqual(
+            len(response.context["clothing_list"]), ProductListView.paginate_by
+            )
+
+        response = self.client.get(url + "&page=2")
+        self.assertEqual(list(response.context["clothing_list"]), [self.jacket])
+
+
+class ProductNumberSearchTest(TestCase):
+    def setUp(self):
+        self.products = [
+            Clothing.objects.create(name="Бушлат", price_low=1, price_high=2)
+            for _ in range(12)
+        ]
+        self.boots = Footwear.objects.create(name="Черевики", price_low=1, price_high=2)
+        self.url = reverse("catalog:product-list")
+
+    def test_product_number_prefix_maps_to_range(self):
+        self.assertEqual(
+            product_number_q("1001", Clothing.CATEGORY),
+            Q(product_number__range=(10010, 10019)),
+        )
+        self.assertEqual(
+            product_number_q("10012", Clothing.CATEGORY), Q(product_number=10012)
+            )
+        self.assertEqual(
+            list(Product.objects.filter(product_number_q("1001"))),
+            list(Product.objects.filter(product_number__range=(10010, 10012))),
+        )
+
+    def test_exact_product_number_redirects_to_product(self):
+        response = self.client.get(self.url + "?search_input=20001")
+        self.assertRedirects(response, self.boots.get_absolute_url())
+
+    def test_non_ascii_digits_are_not_product_numbers(self):
+        response = self.client.get(self.url + "?search_input=²")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["product_list"]), [])
+
+    def test_wishlist_does_not_redirect_on_product_number(self):
+        user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+            )
+        user.wishlist.add(self.boots)
+        self.client.force_login(user)
+        response = self.client.get(
+            reverse("catalog:customer-wishlist") + "?search_input=99999"
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_product_number_prefix_lists_matching_products(self):
+        response = self.client.get(self.url + "?search_input=1001")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [p.product_number for p in response.context["product_list"]],
+            [10012, 10011, 10010],
+        )
+
+    def test_product_number_search_respects_category(self):
+        url = reverse("catalog:footwear-list") + "?search_input=10001"
+        response = self.client.get(url)
+        self.assertEqual(len(response.context["footwear_list"]), 0)
+
+        response = self.client.get(url + "&search_scope=global")
+        self.assertRedirects(response, self.products[0].get_absolute_url())
+
+    def test_admin_search_uses_product_number(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+            )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:catalog_product_changelist") + "?q=2000"
+            )
+        self.assertEqual(
+            [p.product_number for p in response.context["cl"].result_list],
+            [self.boots.product_number],
+        )
+
+    def test_admin_search_ignores_ids_out_of_range(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+            )
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:catalog_product_changelist") + "?q=" + "9" * 25
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["cl"].result_list), [])
+
+
+class SearchSuggestViewTest(TestCase):
+    def setUp(self):
+        self.country = Country.objects.create(ua_name="Бельгія", en_name="Belgium")
+        self.jacket = Clothing.objects.create(
+            name="Бушлат зимовий",
+            country=self.country,
+            price_low=1,
+            price_high=2,
+            )
+        self.url = reverse("catalog:search-suggest")
+        self.addCleanup(suggestion_index.invalidate)
+
+    def suggest(self, query):
+        response = self.client.get(self.url, {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return [
+            (suggestion["kind"], suggestion["label"])
+            for suggestion in response.json()["suggestions"]
+        ]
+
+    def test_suggest_returns_products_numbers_and_countries(self):
+        self.assertEqual(self.suggest("бу"), [("product", "Бушлат зимовий")])
+        self.assertEqual(self.suggest("зим"), [("product", "Бушлат зимовий")])
+        self.assertEqual(self.suggest("1000"), [("number", "10001")])
+        self.assertEqual(self.suggest("бел"), [("country", "Бельгія")])
+        self.assertEqual(self.suggest("bel"), [("country", "Belgium")])
+
+    def test_suggestions_follow_writes_from_other_processes(self):
+        self.assertEqual(self.suggest("кіт"), [])
+        Product.objects.filter(pk=self.jacket.pk).update(name="Кітель")
+        self.assertEqual(self.suggest("кіт"), [("product", "Кітель")])
+
+    def test_suggest_returns_urls(self):
+        response = self.client.get(self.url, {"q": "бушлат"})
+        suggestion = response.json()["suggestions"][0]
+        self.assertEqual(suggestion["url"], self.jacket.get_absolute_url())
+
+    def test_suggest_does_not_query_database_per_keystroke(self):
+        self.suggest("б")
+        with self.assertNumQueries(0):
+            self.suggest("бу")
+            self.suggest("буш")
+
+    def test_suggest_is_invalidated_on_save(self):
+        self.suggest("б")
+        Clothing.objects.create(name="Берці", price_low=1, price_high=2)
+        self.assertIn(("product", "Берці"), self.suggest("бе"))
+
+    def test_suggest_limits_results(self):
+        for i in range(10):
+            Clothing.objects.create(name=f"Бушлат {i}", price_low=1, price_high=2)
+        response = self.client.get(self.url, {"q": "бушлат", "limit": 3})
+        self.assertEqual(len(response.json()["suggestions"]), 3)
@@ -1,5 +1,11 @@
+from unittest import mock
+from urllib.parse import urlencode
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from catalog.models import (
@@ -10,6 +16,7 @@ from catalog.models import (
     Footwear, 
     ProductImage, 
 )
+from catalog.templatetags.query_transform import get_wishlist_urls
 from catalog.tests.category_base_test import CategoryListViewTestBase
 from catalog.views import CountryListView, ProductListView
 
@@ -106,6 +113,103 @@ class ProductListViewTest(TestCase):
         form = response.context["search_form"]
         self.assertEqual(form.initial.get("search_input"), "одяг")
 
+    def test_product_list_view_does_not_load_images_separately(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url + "?page=2")
+        self.assertContains(response, self.product_image.image.url)
+        self.assertFalse(any(
+            'FROM "catalog_productimage"' in query["sql"] for query in queries
+            ))
+
+
+class ProductVisibilityTest(TestCase):
+    def setUp(self):
+        self.published = Clothing.objects.create(
+            name="Test-куртка", price_low=1, price_high=2
+        )
+        self.hidden = Clothing.objects.create(
+            name="Кітель", price_low=1, price_high=2, is_published=False
+        )
+        self.admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+        )
+
+    def get_pks(self, url, params=None):
+        response = self.client.get(url, params)
+        return [product.pk for product in response.context["object_list"]]
+
+    def test_lists_show_only_published_products(self):
+        for url in (reverse("catalog:product-list"), reverse("catalog:clothing-list")):
+            self.assertEqual(self.get_pks(url), [self.published.pk])
+        self.assertEqual(
+            self.get_pks(reverse("catalog:product-list"), {"search_input": "кітель"}),
+            [],
+        )
+
+    def test_unpublished_product_detail_is_staff_only(self):
+        url = self.hidden.get_absolute_url()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_admin_actions_change_visibility(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:catalog_product_changelist")
+        self.client.post(url, {
+            "action": "publish",
+            "_selected_action": [self.hidden.pk],
+        })
+        self.client.post(url, {
+            "action": "unpublish",
+            "_selected_action": [self.published.pk],
+        })
+        self.client.logout()
+        self.assertEqual(
+            self.get_pks(reverse("catalog:product-list")), [self.hidden.pk]
+        )
+
+
+class ProductCardCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.products = [
+            Clothing.objects.create(name=f"Куртка {number}", price_low=1, price_high=2)
+            for number in range(3)
+        ]
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        self.user.wishlist.add(self.products[0])
+        self.url = reverse("catalog:clothing-list")
+
+    def test_cards_are_rendered_from_cache(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        with mock.patch.object(
+            Product, "get_absolute_url", autospec=True
+        ) as get_absolute_url:
+            response = self.client.get(self.url)
+        get_absolute_url.assert_not_called()
+        self.assertContains(response, self.products[1].name)
+
+    def test_wishlist_toggle_is_rendered_per_user(self):
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(self.url), "action=add", count=2)
+
+        other = get_user_model().objects.create_user(
+            email="other@test.com", password="password"
+        )
+        self.client.force_login(other)
+        self.assertContains(self.client.get(self.url), "action=add", count=3)
+
+    def test_card_is_rendered_again_after_change(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.products[1].price_high = 9
+        self.products[1].save()
+        self.assertContains(self.client.get(self.url), "1-9 грн")
+
 
 class ClothingListViewTest(CategoryListViewTestBase, TestCase):
     def setUp(self):
@@ -439,6 +543,33 @@ class CustomerWishlistViewPrivateTest(TestCase):
         response = self.client.get(self.url + f"?page={num_pages}")
         self.assertEqual(len(response.context[self.view]), 1)
 
+    def test_customer_wishlist_view_orders_items_by_time_added(self):
+        first = Product.objects.get(category=Footwear.CATEGORY)
+        first.customers.add(self.user)
+        hidden = Clothing.objects.create(
+            name="кітель", price_low=100, price_high=200, is_published=False
+        )
+        hidden.customers.add(self.user)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context[self.view][0], first)
+        self.assertNotIn(hidden, response.context["paginator"].object_list)
+
+    def test_customer_wishlist_view_query_budget(self):
+        country = Country.objects.create(ua_name="Франція", en_name="France")
+        for product in Product.objects.all():
+            product.country = country
+            product.save()
+            ProductImage.objects.create(
+                product=product,
+                image=f"catalog\\tests\\test_media\\{product.pk}.jpg",
+            )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertContains(response, "Франція", count=self.num_per_page + 1)
+        self.assertLessEqual(len(queries), 6)
+
 
 class UpdateWishlistViewPublicTest(TestCase):
     def setUp(self):
@@ -512,6 +643,92 @@ class UpdateWishlistViewPrivateTest(TestCase):
         response = self.client.get(self.url + f"?next={self.next_list_url}")
         self.assertRedirects(response, self.next_list_url)
 
+    def test_update_wishlist_view_returns_404_for_unknown_product(self):
+        url = reverse("catalog:update-wishlist", kwargs={"product_number": 1})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class WishlistToggleViewTest(TestCase):
+    def setUp(self):
+        self.clothing = Clothing.objects.create(name="одяг", price_low=1, price_high=2)
+        self.user = get_user_model().objects.create_user(
+            email="TestUser@test.com", password="password",
+        )
+        self.url = reverse(
+            "catalog:wishlist-toggle",
+            kwargs={"product_number": self.clothing.product_number},
+        )
+
+    def post(self, action=None, url=None):
+        data = {"action": action} if action else {}
+        return self.client.post(url or self.url, data)
+
+    def test_toggle_returns_new_state(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.post().json(), {
+            "product_number": self.clothing.product_number,
+            "in_wishlist": True,
+            "count": 1,
+        })
+        self.assertIn(self.clothing, self.user.wishlist.all())
+
+        self.assertFalse(self.post("toggle").json()["in_wishlist"])
+        self.assertNotIn(self.clothing, self.user.wishlist.all())
+
+    def test_add_and_remove_are_idempotent(self):
+        self.client.force_login(self.user)
+        for _ in range(2):
+            self.assertEqual(self.post("add").json()["count"], 1)
+        for _ in range(2):
+            self.assertFalse(self.post("remove").json()["in_wishlist"])
+
+    def test_concurrent_add_is_idempotent(self):
+        self.client.force_login(self.user)
+        self.post("add")
+        # The other request's row appears after this one checked for it
+        manager_class = type(self.user.wishlist)
+        with mock.patch.object(
+            manager_class, "_get_missing_target_ids",
+            return_value={self.clothing.pk},
+        ):
+            response = self.post("add")
+        self.assertEqual(response.json()["count"], 1)
+        self.assertEqual(
+            Product.objects.get(pk=self.clothing.pk).wishlist_count, 1
+        )
+
+    def test_errors_are_json(self):
+        self.assertEqual(self.post().status_code, 401)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.post("delete").status_code, 400)
+        url = reverse("catalog:wishlist-toggle", kwargs={"product_number": 1})
+        self.assertEqual(self.post(url=url).status_code, 404)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_toggle_requires_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        self.assertEqual(client.post(self.url).status_code, 403)
+        self.assertFalse(self.user.wishlist.exists())
+
+
+class WishlistUrlsTest(TestCase):
+    def test_urls_match_reversed_urls(self):
+        request = RequestFactory().get("/clothing/", {"search_input": "куртка"})
+        urls = get_wishlist_urls(request)
+        self.assertIs(get_wishlist_urls(request), urls)
+
+        update_url = reverse("catalog:update-wishlist", args=[10001])
+        next_query = urlencode({"next": request.get_full_path()})
+        self.assertEqual(
+            urls.update_url(10001, "add"), f"{update_url}?{next_query}&action=add"
+        )
+        self.assertEqual(urls.update_url(10001), f"{update_url}?{next_query}")
+        self.assertEqual(
+            urls.toggle_url(10001), reverse("catalog:wishlist-toggle", args=[10001])
+        )
+
 
 class ProductImageDetailViewTest(TestCase):
     def setUp(self):
@@ -0,0 +1,160 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.generation import get_generation
+from catalog.models import Clothing, Product
+from catalog.wishlist import get_wishlist
+
+
+class WishlistServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.products = [
+            Clothing.objects.create(name=f"Куртка {number}", price_low=1, price_high=2)
+            for number in range(3)
+        ]
+        self.user = get_user_model().objects.create_user(
+            email="user@test.com", password="password"
+        )
+        self.user.wishlist.add(self.products[0])
+
+    def get_wishlist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [
+            query for query in queries if "catalog_customer_wishlist" in query["sql"]
+        ]
+
+    def test_page_loads_wishlist_once(self):
+        self.client.force_login(self.user)
+        url = reverse("catalog:clothing-list")
+        response, queries = self.get_wishlist_queries(url)
+        self.assertEqual(len(queries), 1)
+        self.assertContains(response, "action=add", count=2)
+
+        _, queries = self.get_wishlist_queries(url)
+        self.assertEqual(queries, [])
+
+        _, queries = self.get_wishlist_queries(self.products[0].get_absolute_url())
+        self.assertEqual(queries, [])
+
+    def test_wishlist_changes_invalidate_cache(self):
+        product_numbers = [product.product_number for product in self.products]
+        self.assertEqual(set(get_wishlist(self.user)), {product_numbers[0]})
+
+        self.user.wishlist.add(self.products[1])
+        self.assertIn(product_numbers[1], get_wishlist(self.user))
+
+        self.products[2].customers.add(self.user)
+        self.assertEqual(get_wishlist(self.user).count, 3)
+
+        self.products[2].customers.clear()
+        self.assertNotIn(product_numbers[2], get_wishlist(self.user))
+
+        self.user.wishlist.remove(self.products[0])
+        self.assertEqual(set(get_wishlist(self.user)), {product_numbers[1]})
+
+        self.products[1].delete()
+        self.assertEqual(get_wishlist(self.user).count, 0)
+
+
+class WishlistCountTest(TestCase):
+    def setUp(self):
+        self.products = [
+            Clothing.objects.create(name=f"Куртка {number}", price_low=1, price_high=2)
+            for number in range(3)
+        ]
+        self.customers = [
+            get_user_model().objects.create_user(
+                email=f"user{number}@test.com", password="password"
+            )
+            for number in range(3)
+        ]
+
+    def get_counts(self):
+        return [
+            Product.objects.get(pk=product.pk).wishlist_count
+            for product in self.products
+        ]
+
+    def test_counts_follow_wishlist_changes(self):
+        first, second, third = self.customers
+        first.wishlist.add(*self.products)
+        first.wishlist.add(self.products[0])
+        self.assertEqual(self.get_counts(), [1, 1, 1])
+
+        self.products[0].customers.add(second, third)
+        second.wishlist.set([self.products[1]])
+        self.assertEqual(self.get_counts(), [2, 2, 1])
+
+        first.wishlist.remove(self.products[2], self.products[2])
+        third.wishlist.remove(self.products[1])
+        self.assertEqual(self.get_counts(), [2, 2, 0])
+
+        self.products[0].customers.clear()
+        first.wishlist.clear()
+        self.assertEqual(self.get_counts(), [0, 1, 0])
+
+        second.delete()
+        self.assertEqual(self.get_counts(), [0, 0, 0])
+
+    def test_saving_stale_product_keeps_count(self):
+        product = Product.objects.get(pk=self.products[0].pk)
+        self.customers[0].wishlist.add(product)
+        product.name = "Кітель"
+        product.save()
+        self.assertEqual(self.get_counts()[0], 1)
+
+    def test_saving_product_does_not_write_counters(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.products[0].save()
+        updates = [
+            query["sql"] for query in queries
+            if query["sql"].startswith('UPDATE "catalog_product"')
+        ]
+        self.assertTrue(updates)
+        for sql in updates:
+            self.assertNotIn('"wishlist_count" =', sql)
+            self.assertNotIn('"main_image_id" =', sql)
+
+    def test_removal_does_not_push_drifted_count_below_zero(self):
+        self.customers[0].wishlist.add(self.products[0])
+        Product._base_manager.update(wishlist_count=0)
+        self.customers[0].wishlist.remove(self.products[0])
+        self.assertEqual(self.get_counts()[0], 0)
+
+    def test_wishlist_changes_keep_catalog_generation(self):
+        generation = get_generation()
+        self.customers[0].wishlist.add(self.products[0])
+        self.customers[0].wishlist.remove(self.products[0])
+        self.assertEqual(get_generation(), generation)
+
+    def test_reconcile_command_fixes_drift(self):
+        self.customers[0].wishlist.add(self.products[0])
+        Product._base_manager.update(wishlist_count=5)
+
+        out = StringIO()
+        call_command("reconcile_wishlist_counts", stdout=out)
+        self.assertIn("3", out.getvalue())
+        self.assertEqual(self.get_counts(), [1, 0, 0])
+
+    def test_stats_admin_does_not_aggregate(self):
+        admin = get_user_model().objects.create_superuser(
+            email="admin@test.com", password="password"
+        )
+        self.customers[0].wishlist.add(self.products[1])
+        self.client.force_login(admin)
+        url = reverse("admin:catalog_productwishliststats_changelist")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"wishitems": "yes"})
+        self.assertEqual(list(response.context["cl"].result_list), [self.products[1]])
+        self.assertFalse(
+            any("catalog_customer_wishlist" in query["sql"] for query in queries)
+        )
@@ -12,7 +12,9 @@ from catalog.views import (
     ProductDetailView, 
     ProductListView, 
     product_image_detail_view,
-    update_wishlist
+    search_suggest_view,
+    update_wishlist,
+    wishlist_toggle_view,
 )
 
 urlpatterns = [
@@ -22,6 +24,12 @@ urlpatterns = [
         "product/<int:product_number>/update-wishlist", 
         update_wishlist, 
         name="update-wishlist"),
+    path(
+        "product/<int:product_number>/wishlist/",
+        wishlist_toggle_view,
+        name="wishlist-toggle",
+        ),
+    path("search/suggest/", search_suggest_view, name="search-suggest"),
     path("clothing/", ClothingListView.as_view(), name="clothing-list"),
     path("footwear/", FootwearListView.as_view(), name="footwear-list"),
     path("accessories/", AccessoryListView.as_view(), name="accessory-list"),
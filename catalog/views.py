@@ -1,28 +1,80 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.views import generic
 from django.views.decorators.clickjacking import xframe_options_exempt
+from django.views.decorators.http import require_POST
 
+from catalog.facets import FacetSet, get_countries
 from catalog.forms import ProductSearchForm, RegistrationForm
+from catalog.generation import get_generation, make_cache_key
 from catalog.models import Product, Clothing, Footwear, Accessory, Country, ProductImage
-
-
-class ProductDetailView(generic.DetailView):
+from catalog.page_cache import (
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    conditional_response,
+    make_etag,
+)
+from catalog.pagination import (
+    CachedCountPaginator,
+    KeysetPaginationMixin,
+    WishlistCountPaginator,
+    WishlistKeysetPaginator,
+)
+from catalog.search import search_products
+from catalog.search.numbers import is_product_number
+from catalog.search.suggest import suggestion_index
+from catalog.wishlist import add_to_wishlist, get_wishlist
+
+
+class ProductDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, generic.DetailView
+    ):
     model = Product
     
     def get_queryset(self):
-        qs = super().get_queryset().select_related("country").prefetch_related("images")
+        qs = super().get_queryset().select_related("country", "main_image")\
+            .prefetch_related("images")
+        if not self.request.user.is_staff:
+            qs = qs.published()
         return qs
 
+    def get_last_modified(self):
+        key = make_cache_key(
+            "last-modified", self.kwargs["slug"], self.request.user.is_staff
+        )
+        return cache.get_or_set(
+            key, self.get_updated_at, settings.CATALOG_CACHE_TIMEOUT
+        )
+
+    def get_updated_at(self):
+        dates = self.get_queryset().filter(slug=self.kwargs["slug"]).aggregate(
+            product=Max("updated_at"),
+            country=Max("country__updated_at"),
+            images=Max("images__updated_at"),
+        )
+        dates = [date for date in dates.values() if date is not None]
+        return max(dates, default=None)
+
 
-class ProductListView(generic.ListView):
+class ProductListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    KeysetPaginationMixin,
+    generic.ListView,
+    ):
     model = Product
     paginate_by = 12
+    paginator_class = CachedCountPaginator
     default_search_scope = "category"
+    search_enabled = True
+    facet_set = None
 
     def get_search_scope(self):
         if "search_scope" in self.request.GET:
@@ -30,24 +82,42 @@ class ProductListView(generic.ListView):
             self.request.session["search_scope"] = search_scope
         return self.request.session.get("search_scope", self.default_search_scope)
 
+    def get_page_cache_parts(self):
+        return super().get_page_cache_parts() + (self.get_search_scope(),)
+
+    def get(self, request, *args, **kwargs):
+        search_input = request.GET.get("search_input", "").strip()
+        if self.search_enabled and is_product_number(search_input):
+            products = self.get_queryset()[:2]
+            if len(products) == 1:
+                return redirect(products[0])
+        return super().get(request, *args, **kwargs)
+
+    def get_scope(self):
+        model = self.queryset.model if self.queryset is not None else self.model
+        if hasattr(model, "CATEGORY"):
+            return {"category": model.CATEGORY}
+        return {}
+
     def get_queryset(self):
-        queryset = \
-            super().get_queryset().select_related("country").prefetch_related("images")
+        queryset = super().get_queryset().select_related("country", "main_image")
         search_input = self.request.GET.get("search_input")
         search_scope = self.get_search_scope()
-        
+        scope = {}
+
+        if search_input and search_scope == "global":
+            queryset = Product.objects.select_related("country", "main_image")
+        else:
+            scope = self.get_scope()
+            queryset = queryset.filter(**scope)
+
+        queryset = queryset.published()
         if search_input:
-            if search_scope == "global":
-                queryset = Product.objects.all()
-
-            queryset = queryset.filter(
-                Q(name__icontains=search_input) |
-                Q(country__ua_name__icontains=search_input) |
-                Q(country__en_name__icontains=search_input) |
-                Q(description__icontains=search_input) |
-                Q(product_number__icontains=search_input)
-            )
-        return queryset.filter(~Q(name__icontains="test"))
+            queryset = search_products(queryset, search_input, scope)
+
+        self.facet_set = FacetSet(self.request.GET, scope)
+        self.unfiltered_queryset = queryset
+        return self.facet_set.filter(queryset)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -58,6 +128,13 @@ class ProductListView(generic.ListView):
             initial={"search_input": search_input, "search_scope": search_scope}
         )
         context["search_scope"] = search_scope
+        context["catalog_generation"] = get_generation()
+        context["catalog_cache_timeout"] = settings.CATALOG_CACHE_TIMEOUT
+        if self.facet_set is not None:
+            context["facets"] = self.facet_set.get_context(
+                self.unfiltered_queryset, search_input
+            )
+            context["selected_facets"] = self.facet_set.selected
         return context
 
 
@@ -84,12 +161,11 @@ class CountryListView(generic.ListView):
 class CountryProductsListView(ProductListView):
     template_name = "catalog/product_list.html"
 
-    def get_queryset(self):
-        if self.request.GET.get("search_scope") == "global":
-            return super().get_queryset()
-        
-        country = get_object_or_404(Country, en_name=self.kwargs.get("name"))
-        return super().get_queryset().filter(country=country)
+    def get_scope(self):
+        for country in get_countries():
+            if country["en_name"] == self.kwargs.get("name"):
+                return {"country_id": country["id"]}
+        raise Http404("Країну не знайдено")
 
 
 class RegistrationView(generic.CreateView):
@@ -135,26 +211,85 @@ class CustomerUpdateView(LoginRequiredMixin, generic.UpdateView):
 
 class CustomerWishlistView(LoginRequiredMixin, ProductListView):
     template_name = "catalog/product_list.html"
+    cache_anonymous_pages = False
+    search_enabled = False
+    paginator_class = WishlistCountPaginator
+    keyset_paginator_class = WishlistKeysetPaginator
 
     def get_queryset(self):
-        return self.request.user.wishlist.all()
+        return Product.objects.published().filter(
+            wishlistitem__customer=self.request.user
+            ).select_related("country", "main_image").annotate(
+            wishlist_added_at=F("wishlistitem__added_at"),
+            wishlist_item_id=F("wishlistitem__id"),
+            ).order_by(*WishlistKeysetPaginator.ordering)
 
 
 @login_required
 def update_wishlist(request, product_number):
     customer = request.user
-    product = Product.objects.get(product_number=product_number)
+    product = get_object_or_404(Product, product_number=product_number)
     action = request.GET.get("action")
 
     if action == "add":
-        customer.wishlist.add(product)
+        add_to_wishlist(customer, product)
     else:
         customer.wishlist.remove(product)
             
     return redirect(request.GET.get("next", "/"))
 
 
+@require_POST
+def wishlist_toggle_view(request, product_number):
+    customer = request.user
+    if not customer.is_authenticated:
+        return JsonResponse({"error": "Увійдіть у кабінет"}, status=401)
+
+    action = request.POST.get("action", "toggle")
+    if action not in ("add", "remove", "toggle"):
+        return JsonResponse({"error": "Невідома дія"}, status=400)
+
+    product = Product.objects.filter(product_number=product_number).first()
+    if product is None:
+        return JsonResponse({"error": "Товар не знайдено"}, status=404)
+
+    if action == "toggle":
+        in_wishlist = product_number in get_wishlist(customer)
+        action = "remove" if in_wishlist else "add"
+
+    if action == "add":
+        add_to_wishlist(customer, product)
+    else:
+        customer.wishlist.remove(product)
+
+    wishlist = get_wishlist(customer)
+    return JsonResponse({
+        "product_number": product_number,
+        "in_wishlist": product_number in wishlist,
+        "count": wishlist.count,
+    })
+
+
 @xframe_options_exempt
 def product_image_detail_view(request, image_pk):
-    image = get_object_or_404(ProductImage, pk=image_pk)
-    return render(request, "catalog/product_image_detail.html", {"image": image})
+    last_modified = ProductImage.objects.filter(pk=image_pk).values_list(
+        "updated_at", flat=True
+        ).first()
+
+    def response():
+        image = get_object_or_404(ProductImage, pk=image_pk)
+        return render(request, "catalog/product_image_detail.html", {"image": image})
+
+    return conditional_response(
+        request, response, make_etag(request.path), last_modified
+    )
+
+
+def search_suggest_view(request):
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 8)), 20))
+    except ValueError:
+        limit = 8
+
+    suggestions = suggestion_index.suggest(request.GET.get("q", ""), limit)
+    return JsonResponse({"suggestions": suggestions})
@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from catalog.generation import make_cache_key
+
+
+class Wishlist:
+    """Product numbers in a customer's wishlist with O(1) membership checks."""
+
+    def __init__(self, product_numbers=()):
+        self.product_numbers = frozenset(product_numbers)
+
+    def __contains__(self, product_number):
+        return product_number in self.product_numbers
+
+    def __iter__(self):
+        return iter(self.product_numbers)
+
+    def __len__(self):
+        return len(self.product_numbers)
+
+    @property
+    def count(self):
+        return len(self.product_numbers)
+
+
+def wishlist_cache_key(user_pk):
+    return make_cache_key("wishlist", user_pk)
+
+
+def get_wishlist(user):
+    """The user's wishlist, cached until it or the catalog changes.
+
+    Deleting a product removes it from wishlists without m2m_changed, so the
+    key also embeds the catalog generation.
+    """
+    if not user.is_authenticated:
+        return Wishlist()
+
+    key = wishlist_cache_key(user.pk)
+    product_numbers = cache.get(key)
+    if product_numbers is None:
+        product_numbers = frozenset(
+            user.wishlist.values_list("product_number", flat=True)
+        )
+        cache.set(key, product_numbers, settings.CATALOG_CACHE_TIMEOUT)
+    return Wishlist(product_numbers)
+
+
+def get_request_wishlist(request):
+    """get_wishlist() for request.user, loaded at most once per request."""
+    if not hasattr(request, "_wishlist"):
+        request._wishlist = get_wishlist(request.user)
+    return request._wishlist
+
+
+def invalidate_wishlists(user_pks):
+    cache.delete_many([wishlist_cache_key(user_pk) for user_pk in user_pks])
+
+
+def add_to_wishlist(user, product):
+    """Add the product to the wishlist, tolerating a concurrent add.
+
+    With the WishlistItem through model Django inserts without
+    ignore_conflicts, so a double click can hit the unique constraint. The
+    losing insert rolls back before post_add, so wishlist_count stays exact.
+    """
+    try:
+        with transaction.atomic():
+            user.wishlist.add(product)
+    except IntegrityError:
+        if not user.wishlist.through.objects.filter(
+            customer=user, product=product
+        ).exists():
+            raise
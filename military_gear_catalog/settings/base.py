@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "catalog",
     "crispy_forms",
     "crispy_bootstrap4",
@@ -127,6 +128,23 @@ LOGIN_REDIRECT_URL = "/"
 
 CRISPY_TEMPLATE_PACK = "bootstrap4"
 
+# Full-text search configuration used next to "simple" on PostgreSQL.
+# Set to "ukrainian" on servers with the Ukrainian dictionary installed.
+CATALOG_SEARCH_CONFIG = os.environ.get("CATALOG_SEARCH_CONFIG", "simple")
+
+# Search backend for the product list. Empty means "pick by database vendor";
+# "memory" serves searches from the in-process inverted index.
+CATALOG_SEARCH_BACKEND = os.environ.get("CATALOG_SEARCH_BACKEND", "")
+
+# Pagination of product lists: "offset" numbers the pages, "keyset" pages by
+# (available, id) cursors without OFFSET and COUNT(*) queries.
+CATALOG_PAGINATION_MODE = os.environ.get("CATALOG_PAGINATION_MODE", "offset")
+
+# Catalog cache keys embed a generation counter that is bumped on every
+# catalog write. The timeout is only a safety net for bumps that never reach
+# the cache, for example when it is not shared between processes.
+CATALOG_CACHE_TIMEOUT = int(os.environ.get("CATALOG_CACHE_TIMEOUT", 3600))
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
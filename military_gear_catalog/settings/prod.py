@@ -26,6 +26,28 @@ DATABASES = {
 }
 
 
+# Cache
+# The catalog cache generation must be shared by all workers and by management
+# commands, so production needs a shared cache: Redis when REDIS_URL is set
+# (requires the redis package), otherwise the database cache table created
+# by "manage.py createcachetable".
+
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
+
 # Media storage
 
 DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
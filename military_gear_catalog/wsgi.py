@@ -16,3 +16,7 @@ os.environ.setdefault(
 )
 
 application = get_wsgi_application()
+
+from catalog.search import warm_up_search_index  # noqa: E402
+
+warm_up_search_index()
@@ -0,0 +1,40 @@
+(function () {
+  const list = document.getElementById("search-suggestions");
+  const input = document.querySelector('input[list="search-suggestions"]');
+  if (!list || !input) {
+    return;
+  }
+
+  let timer = null;
+  let controller = null;
+
+  function render(suggestions) {
+    list.replaceChildren(...suggestions.map(function (suggestion) {
+      const option = document.createElement("option");
+      option.value = suggestion.label;
+      return option;
+    }));
+  }
+
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    const query = input.value.trim();
+    if (!query) {
+      render([]);
+      return;
+    }
+
+    timer = setTimeout(function () {
+      if (controller) {
+        controller.abort();
+      }
+      controller = new AbortController();
+      const url = list.dataset.url + "?q=" + encodeURIComponent(query);
+
+      fetch(url, {signal: controller.signal})
+        .then(function (response) { return response.json(); })
+        .then(function (data) { render(data.suggestions); })
+        .catch(function () {});
+    }, 150);
+  });
+})();
@@ -0,0 +1,61 @@
+(function () {
+  const script = document.currentScript;
+  const csrfInput = document.querySelector('input[name="csrfmiddlewaretoken"]');
+  if (!script || !csrfInput) {
+    return;
+  }
+
+  const icons = {
+    true: script.dataset.solidIcon,
+    false: script.dataset.emptyIcon,
+  };
+  const labels = {
+    true: "Видалити зі списку бажань",
+    false: "Додати до списку бажань",
+  };
+
+  function render(link, data) {
+    const image = link.querySelector("img");
+    image.src = icons[data.in_wishlist];
+    image.alt = labels[data.in_wishlist];
+
+    const url = new URL(link.href);
+    if (data.in_wishlist) {
+      url.searchParams.delete("action");
+    } else {
+      url.searchParams.set("action", "add");
+    }
+    link.href = url.toString();
+
+    const shield = document.getElementById("wishlist-shield");
+    if (shield) {
+      shield.src = icons[data.count > 0];
+    }
+  }
+
+  document.addEventListener("click", function (event) {
+    const link = event.target.closest("a.wishlist-toggle");
+    if (!link) {
+      return;
+    }
+    event.preventDefault();
+
+    const body = new FormData();
+    body.append("action", "toggle");
+
+    fetch(link.dataset.url, {
+      method: "POST",
+      body: body,
+      headers: {"X-CSRFToken": csrfInput.value},
+      credentials: "same-origin",
+    })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.statusText);
+        }
+        return response.json();
+      })
+      .then(function (data) { render(link, data); })
+      .catch(function () { window.location.href = link.href; });
+  });
+})();